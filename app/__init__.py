@@ -4,7 +4,17 @@ from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from dotenv import load_dotenv
+from utils.figure_cache import FigureCache
+from utils.identity_cache import IdentityCache
+from utils.events import EventBroker
+from utils.instrumentation import Instrumentation
+from utils.query_counter import QueryCounter
+from utils.password_hasher import PasswordHasher
+from utils.task_store import TaskStore
+from utils.workspace_store import WorkspaceStore
+import importlib
 import os
+import time
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +24,17 @@ db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 csrf = CSRFProtect()
+figure_cache = FigureCache()
+password_hasher = PasswordHasher()
+identity_cache = IdentityCache()
+event_broker = EventBroker()
+instrumentation = Instrumentation()
+query_counter = QueryCounter()
+task_store = TaskStore()
+workspace_store = WorkspaceStore()
+
+# Blueprints the app can run without
+OPTIONAL_BLUEPRINTS = ('main',)
 
 def create_app():
     app = Flask(__name__)
@@ -22,26 +43,91 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-key-please-change-in-production')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///app.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['TASKS_PER_PAGE'] = int(os.getenv('TASKS_PER_PAGE', 50))
+    app.config['TASKS_MAX_PER_PAGE'] = int(os.getenv('TASKS_MAX_PER_PAGE', 200))
+    app.config['FIGURE_CACHE_SIZE'] = int(os.getenv('FIGURE_CACHE_SIZE', 512))
+    app.config['ANALYTICS_CLIENT_RENDERING'] = os.getenv('ANALYTICS_CLIENT_RENDERING', 'false').lower() == 'true'
+    app.config['TASK_STORE_MAX_MB'] = int(os.getenv('TASK_STORE_MAX_MB', 64))
+    app.config['TASK_STORE_MAX_AGE'] = float(os.getenv('TASK_STORE_MAX_AGE', 5))
+    app.config['WORKSPACE_CACHE_TTL'] = float(os.getenv('WORKSPACE_CACHE_TTL', 60))
+    app.config['WORKSPACE_CACHE_SIZE'] = int(os.getenv('WORKSPACE_CACHE_SIZE', 256))
+    app.config['AUTO_CREATE_TABLES'] = os.getenv('AUTO_CREATE_TABLES', 'false').lower() == 'true'
+    app.config['PRELOAD_SERVICES'] = os.getenv('PRELOAD_SERVICES', 'false').lower() == 'true'
+    app.config['BCRYPT_ROUNDS'] = int(os.getenv('BCRYPT_ROUNDS', 12))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 4))
+    app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 0.25))
+    app.config['IDENTITY_CACHE_TTL'] = float(os.getenv('IDENTITY_CACHE_TTL', 5))
+    app.config['IDENTITY_CACHE_MAX_AGE'] = float(os.getenv('IDENTITY_CACHE_MAX_AGE', 1))
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.getenv('IDENTITY_CACHE_SIZE', 1024))
+    app.config['TASK_INTAKE_MODE'] = os.getenv('TASK_INTAKE_MODE', 'sync')
+    app.config['TASK_ENRICHMENT_BATCH_SIZE'] = int(os.getenv('TASK_ENRICHMENT_BATCH_SIZE', 32))
+    app.config['TASK_ENRICHMENT_INTERVAL'] = float(os.getenv('TASK_ENRICHMENT_INTERVAL', 5))
+    app.config['EVENT_QUEUE_SIZE'] = int(os.getenv('EVENT_QUEUE_SIZE', 100))
+    app.config['EVENT_HEARTBEAT'] = float(os.getenv('EVENT_HEARTBEAT', 15))
+    app.config['ACCOUNT_DELETE_BACKGROUND_THRESHOLD'] = int(os.getenv('ACCOUNT_DELETE_BACKGROUND_THRESHOLD', 10000))
+    app.config['INSTRUMENTATION_ENABLED'] = os.getenv('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['SQL_QUERY_DEBUG'] = os.getenv('SQL_QUERY_DEBUG', 'false').lower() == 'true'
+    app.config['SQL_N_PLUS_ONE_THRESHOLD'] = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 5))
+    app.config['SQL_QUERY_BUDGET'] = int(os.getenv('SQL_QUERY_BUDGET', 0)) or None
+    app.config['PROFILER_ENABLED'] = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+    app.config['PROFILER_TOKEN'] = os.getenv('PROFILER_TOKEN')
+    app.config['PROFILER_ALLOWED_USERS'] = [
+        username.strip() for username in os.getenv('PROFILER_ALLOWED_USERS', '').split(',') if username.strip()
+    ]
     
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     csrf.init_app(app)
+    figure_cache.init_app(app)
+    task_store.init_app(app)
+    workspace_store.init_app(app)
+    password_hasher.init_app(app)
+    identity_cache.init_app(app)
+    event_broker.init_app(app)
+    instrumentation.init_app(app)
+    query_counter.init_app(app)
     
     # Configure login
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'info'
     
-    # Register blueprints
-    from app.routes import main, auth, tasks, analytics
-    app.register_blueprint(main.bp)
-    app.register_blueprint(auth.bp)
-    app.register_blueprint(tasks.bp)
-    app.register_blueprint(analytics.bp)
+    # Register blueprints, recording how long each one takes to import
+    startup_timings = app.extensions.setdefault('startup_timings', {})
+    for name in ('main', 'auth', 'tasks', 'analytics', 'workspaces', 'events', 'monitoring'):
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(f'app.routes.{name}')
+        except ModuleNotFoundError as error:
+            # The page blueprint is optional, e.g. for API-only and test apps
+            if name not in OPTIONAL_BLUEPRINTS or error.name != f'app.routes.{name}':
+                raise
+            app.logger.warning('Blueprint app.routes.%s is not available; skipping it', name)
+            continue
+        startup_timings[f'app.routes.{name}'] = (time.perf_counter() - started) * 1000
+        app.register_blueprint(module.bp)
+    
+    # Register command line tools
+    from app import cli
+    cli.init_app(app)
+    
+    # Schema changes are applied with `flask db upgrade`; creating tables on
+    # boot is only for throwaway databases
+    if app.config['AUTO_CREATE_TABLES']:
+        with app.app_context():
+            db.create_all()
+    
+    # NLP, ML and charting services load on first use unless preloaded,
+    # e.g. so a preforking server can share them between workers
+    if app.config['PRELOAD_SERVICES']:
+        from utils.lazy import warm_all
+        warm_all()
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    app.logger.info('Blueprint imports: %s', ', '.join(
+        f'{name} {elapsed:.1f} ms' for name, elapsed in startup_timings.items()
+    ))
     
     return app 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import click
+from flask.cli import with_appcontext
+
+@click.command('explain-queries')
+@click.option('--user-id', default=1, help='User id to bind into the sample queries.')
+@with_appcontext
+def explain_queries_command(user_id):
+    """Show query plans for the hot queries and fail on full table or index scans."""
+    from utils.query_plans import check_hot_queries
+    
+    report = check_hot_queries(user_id)
+    failed = False
+    
+    for name, result in report.items():
+        status = 'FULL SCAN' if result['full_scans'] else 'ok'
+        click.echo(f'{name}: {status}')
+        for line in result['plan']:
+            click.echo(f'    {line}')
+        failed = failed or bool(result['full_scans'])
+    
+    if failed:
+        raise click.ClickException('Some hot queries scan a whole table or index')
+
+@click.command('import-tasks')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=int, required=True, help='Owner of the imported tasks.')
+@click.option('--batch-size', default=50000, help='Rows inserted per statement.')
+@with_appcontext
+def import_tasks_command(path, user_id, batch_size):
+    """Bulk load tasks from a Parquet, Arrow IPC or NDJSON export."""
+    from utils.bulk_import import import_tasks
+    
+    imported = import_tasks(path, user_id, batch_size)
+    click.echo(f'Imported {imported} tasks for user {user_id}')
+
+@click.command('startup-report')
+@click.option('--warm', is_flag=True, help='Also load the lazily imported services.')
+@with_appcontext
+def startup_report_command(warm):
+    """Show where app startup time goes."""
+    from flask import current_app
+    from utils import lazy
+    
+    click.echo('Blueprint imports:')
+    for name, elapsed in current_app.extensions.get('startup_timings', {}).items():
+        click.echo(f'    {name}: {elapsed:.1f} ms')
+    
+    if warm:
+        lazy.warm_all()
+    
+    click.echo('Lazy services:')
+    for name, times in lazy.load_times.items():
+        click.echo(f"    {name}: import {times['import_ms']:.1f} ms, init {times['init_ms']:.1f} ms")
+
+@click.command('enrich-tasks')
+@click.option('--batch-size', default=None, type=int, help='Tasks enriched per batch.')
+@click.option('--loop', is_flag=True, help='Keep polling for new tasks instead of exiting.')
+@with_appcontext
+def enrich_tasks_command(batch_size, loop):
+    """Fill in NLP and ML fields for tasks queued by async intake."""
+    from flask import current_app
+    from app.routes.tasks import nlp_processor, ml_engine, _after_enrichment
+    from utils.enrichment import enrich_pending_tasks
+    import time
+    
+    batch_size = batch_size or current_app.config['TASK_ENRICHMENT_BATCH_SIZE']
+    total = 0
+    
+    while True:
+        enriched = enrich_pending_tasks(nlp_processor, ml_engine, batch_size, _after_enrichment)
+        total += enriched
+        if not enriched:
+            if not loop:
+                break
+            time.sleep(current_app.config['TASK_ENRICHMENT_INTERVAL'])
+    
+    click.echo(f'Enriched {total} tasks')
+
+def init_app(app):
+    """Register the command line interface with the app"""
+    app.cli.add_command(explain_queries_command)
+    app.cli.add_command(import_tasks_command)
+    app.cli.add_command(startup_report_command)
+    app.cli.add_command(enrich_tasks_command)
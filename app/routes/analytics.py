@@ -1,55 +1,163 @@
-from flask import Blueprint, render_template, jsonify, request
+from flask import Blueprint, render_template, jsonify, request, abort, Response, stream_with_context, current_app
 from flask_login import login_required, current_user
+from app import db, figure_cache, task_store, workspace_store
 from models.analytics import UserAnalytics
 from models.task import Task
-from utils.data_visualizer import DataVisualizer
-from utils.ml_engine import MLEngine
+from models.workspace import WorkspaceMember
+from utils.lazy import LazyInstance
+from utils.instrumentation import span
+from utils.task_serializer import to_records
+from utils import export, trends
 from datetime import datetime, timedelta
 import json
+import orjson
 
 bp = Blueprint('analytics', __name__)
-data_visualizer = DataVisualizer()
-ml_engine = MLEngine()
+data_visualizer = LazyInstance('utils.data_visualizer', 'DataVisualizer', stage='charts')
+ml_engine = LazyInstance('utils.ml_engine', 'MLEngine', stage='ml')
+
+# Numeric NumPy arrays are written directly instead of being boxed into lists
+CHART_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+@bp.context_processor
+def chart_rendering():
+    """Tell templates whether charts arrive as figures or as chart data"""
+    client = current_app.config['ANALYTICS_CLIENT_RENDERING']
+    return {'chart_attribute': 'data-chart' if client else 'data-figure'}
+
+def _wants_chart_data():
+    return request.args.get('format') == 'data'
+
+def _chart_data_response(charts):
+    """Return compact chart data for the browser to draw with charts.js"""
+    return Response(orjson.dumps(charts, option=CHART_JSON_OPTIONS), mimetype='application/json')
+
+def _build_figures(charts):
+    """Draw figures for a chart, a dict of charts, or None"""
+    if charts is None:
+        return None
+    with span('plotly.build'):
+        if 'spec' in charts:
+            return data_visualizer.build_figure(charts)
+        return {name: data_visualizer.build_figure(chart) for name, chart in charts.items()}
+
+def _encode_chart_data(charts):
+    """Encode chart data the same way figures are encoded for templates"""
+    if charts is None:
+        return None
+    if 'spec' in charts:
+        return orjson.dumps(charts, option=CHART_JSON_OPTIONS).decode('utf-8')
+    return {name: _encode_chart_data(chart) for name, chart in charts.items()}
+
+def _render_charts(chart_type, inputs, build_data, owner=None):
+    """Serialize a view's charts for its template
+    
+    In client rendering mode only the compact chart data is shipped;
+    otherwise the Plotly figures are built from it and cached as JSON under
+    ``owner``, the current user unless given.
+    """
+    if current_app.config['ANALYTICS_CLIENT_RENDERING']:
+        return _encode_chart_data(build_data())
+    return figure_cache.get_or_build(
+        owner or current_user.id, chart_type, inputs, lambda: _build_figures(build_data())
+    )
 
 @bp.route('/analytics/dashboard')
 @login_required
 def dashboard():
     # Get user's analytics
-    analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
+    analytics_data = UserAnalytics.query.filter_by(user_id=current_user.id).first().to_dict()
+    
+    if _wants_chart_data():
+        return _chart_data_response({
+            'dashboard': data_visualizer.productivity_dashboard_data(analytics_data),
+            'metrics': data_visualizer.performance_metrics_data(analytics_data)
+        })
     
     # Create productivity dashboard
-    dashboard = data_visualizer.create_productivity_dashboard(analytics.to_dict())
+    dashboard = _render_charts(
+        'productivity_dashboard', analytics_data,
+        lambda: data_visualizer.productivity_dashboard_data(analytics_data)
+    )
     
     # Get performance metrics
-    metrics = data_visualizer.create_performance_metrics(analytics.to_dict())
+    metrics = _render_charts(
+        'performance_metrics', analytics_data,
+        lambda: data_visualizer.performance_metrics_data(analytics_data)
+    )
     
     return render_template('analytics/dashboard.html', dashboard=dashboard, metrics=metrics)
 
+# Task frame columns read by DataVisualizer.task_analysis_data()
+ANALYSIS_FIELDS = ('id', 'status', 'priority', 'category', 'estimated_duration', 'actual_duration')
+
 @bp.route('/analytics/task-analysis')
 @login_required
 def task_analysis():
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
+    # Read only the charted columns from the user's cached task frame
+    frame = task_store.get(current_user.id)
+    task_data = frame.to_pandas(ANALYSIS_FIELDS)
     
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    if _wants_chart_data():
+        return _chart_data_response(data_visualizer.task_analysis_data(task_data))
     
     # Create task analysis report
-    report = data_visualizer.create_task_analysis_report(task_data)
+    report = _render_charts(
+        'task_analysis_report', frame.fingerprint,
+        lambda: data_visualizer.task_analysis_data(task_data)
+    )
     
     return render_template('analytics/task_analysis.html', report=report)
 
+# Columns drawn by the task timeline
+TIMELINE_COLUMNS = (
+    Task.id, Task.title, Task.status, Task.priority, Task.category,
+    Task.due_date, Task.completed_at, Task.estimated_duration
+)
+
+def _parse_date_arg(name):
+    """Parse an optional ISO date query argument"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f'Invalid date for {name}: {value}')
+
 @bp.route('/analytics/productivity-timeline')
 @login_required
 def productivity_timeline():
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    start = _parse_date_arg('start')
+    end = _parse_date_arg('end')
+    max_tasks = max(1, min(request.args.get('limit', 500, type=int), 2000))
+    
+    # Window and rank in SQL so only the tasks that will be drawn are loaded
+    criteria = [Task.user_id == current_user.id]
+    if start:
+        criteria.append(Task.due_date >= start)
+    if end:
+        criteria.append(Task.due_date <= end)
+    rows = db.session.execute(db.select(*TIMELINE_COLUMNS).where(*criteria).order_by(
+        Task.priority.desc(), Task.due_date.asc().nulls_last()
+    ).limit(max_tasks)).all()
+    
+    # Only a full page can have been cut short, so count just then
+    total = len(rows)
+    if total == max_tasks:
+        total = db.session.execute(db.select(db.func.count(Task.id)).where(*criteria)).scalar()
+    
+    # Convert rows to dictionary format
+    task_data = to_records(rows, TIMELINE_COLUMNS)
+    
+    if _wants_chart_data():
+        return _chart_data_response(data_visualizer.task_timeline_data(task_data, start, end, max_tasks, total))
     
     # Create task timeline
-    timeline = data_visualizer.create_task_timeline(task_data)
+    timeline = _render_charts(
+        'task_timeline', [task_data, start, end, max_tasks, total],
+        lambda: data_visualizer.task_timeline_data(task_data, start, end, max_tasks, total)
+    )
     
     return render_template('analytics/productivity_timeline.html', timeline=timeline)
 
@@ -57,56 +165,74 @@ def productivity_timeline():
 @login_required
 def productivity_heatmap():
     # Get user's analytics
-    analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
+    analytics_data = UserAnalytics.query.filter_by(user_id=current_user.id).first().to_dict()
+    
+    if _wants_chart_data():
+        return _chart_data_response(data_visualizer.productivity_heatmap_data(analytics_data))
     
     # Create productivity heatmap
-    heatmap = data_visualizer.create_productivity_heatmap(analytics.to_dict())
+    heatmap = _render_charts(
+        'productivity_heatmap', analytics_data,
+        lambda: data_visualizer.productivity_heatmap_data(analytics_data)
+    )
     
     return render_template('analytics/productivity_heatmap.html', heatmap=heatmap)
 
 @bp.route('/analytics/task-patterns')
 @login_required
 def task_patterns():
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    # Pattern analysis reads the cached task frame's codes directly
+    task_data = task_store.get(current_user.id)
     
     # Analyze task patterns
     patterns = ml_engine.analyze_task_patterns(task_data)
     
     return render_template('analytics/task_patterns.html', patterns=patterns)
 
+# Longest window the trends API serves, long enough for multi-year views
+MAX_TREND_DAYS = 3660
+
+def _local_date_arg(name, zone):
+    """Parse an optional ISO date argument as naive local time in ``zone``"""
+    value = _parse_date_arg(name)
+    if value is not None and value.tzinfo is not None:
+        try:
+            value = value.astimezone(zone).replace(tzinfo=None)
+        except OverflowError:
+            abort(400, f'Invalid date for {name}: {request.args.get(name)}')
+    return value
+
 @bp.route('/analytics/completion-trends')
 @login_required
 def completion_trends():
-    # Get tasks completed in the last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    completed_tasks = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.status == 'completed',
-        Task.completed_at >= thirty_days_ago
-    ).order_by(Task.completed_at.asc()).all()
-    
-    # Group tasks by completion date
-    completion_data = {}
-    for task in completed_tasks:
-        date = task.completed_at.date().isoformat()
-        if date not in completion_data:
-            completion_data[date] = 0
-        completion_data[date] += 1
-    
-    return jsonify(completion_data)
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in trends.BUCKETS:
+        abort(400, f'Unsupported bucket: {bucket}')
+    
+    # Windows are given and bucketed in the user's local time; bounds with
+    # an explicit offset are converted to it
+    zone = current_user.zone
+    end = _local_date_arg('end', zone) or datetime.now(zone).replace(tzinfo=None)
+    start = _local_date_arg('start', zone)
+    try:
+        if start is None:
+            days = min(request.args.get('days', 30, type=int), MAX_TREND_DAYS)
+            start = trends.bucket_start(end - timedelta(days=days), bucket)
+        if start >= end:
+            abort(400, 'The trend window must end after it starts')
+        if end - start > timedelta(days=MAX_TREND_DAYS):
+            abort(400, f'The trend window is limited to {MAX_TREND_DAYS} days')
+        
+        by_category = request.args.get('split') == 'category'
+        return jsonify(trends.completion_trends(current_user.id, start, end, bucket, zone, by_category))
+    except OverflowError:
+        abort(400, 'The trend window falls outside the supported dates')
 
 @bp.route('/analytics/category-performance')
 @login_required
 def category_performance():
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    # Pattern analysis reads the cached task frame's codes directly
+    task_data = task_store.get(current_user.id)
     
     # Analyze patterns
     patterns = ml_engine.analyze_task_patterns(task_data)
@@ -123,34 +249,107 @@ def category_performance():
 @bp.route('/analytics/time-distribution')
 @login_required
 def time_distribution():
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    # Pattern analysis reads the cached task frame's codes directly
+    task_data = task_store.get(current_user.id)
     
     # Analyze patterns
     patterns = ml_engine.analyze_task_patterns(task_data)
     
     return jsonify(patterns.get('completion_by_time', {}))
 
+def _workspace_rollup(workspace_id):
+    """The cached analytics rollup of a workspace the current user belongs to"""
+    if not WorkspaceMember.is_member(workspace_id, current_user.id):
+        abort(404)
+    return workspace_store.get(workspace_id)
+
+@bp.route('/analytics/workspaces/<int:workspace_id>')
+@login_required
+def workspace_summary(workspace_id):
+    return jsonify(_workspace_rollup(workspace_id))
+
+@bp.route('/analytics/workspaces/<int:workspace_id>/dashboard')
+@login_required
+def workspace_dashboard(workspace_id):
+    # The rollup has the shape of a user's analytics, so the charts are shared
+    analytics_data = _workspace_rollup(workspace_id)
+    
+    if _wants_chart_data():
+        return _chart_data_response({
+            'dashboard': data_visualizer.productivity_dashboard_data(analytics_data),
+            'metrics': data_visualizer.performance_metrics_data(analytics_data)
+        })
+    
+    # Figures are cached per workspace, so members share them
+    owner = ('workspace', workspace_id)
+    dashboard = _render_charts(
+        'productivity_dashboard', analytics_data,
+        lambda: data_visualizer.productivity_dashboard_data(analytics_data), owner
+    )
+    metrics = _render_charts(
+        'performance_metrics', analytics_data,
+        lambda: data_visualizer.performance_metrics_data(analytics_data), owner
+    )
+    
+    return render_template('analytics/dashboard.html', dashboard=dashboard, metrics=metrics,
+                           workspace_id=workspace_id)
+
+@bp.route('/analytics/workspaces/<int:workspace_id>/heatmap')
+@login_required
+def workspace_heatmap(workspace_id):
+    analytics_data = _workspace_rollup(workspace_id)
+    
+    if _wants_chart_data():
+        return _chart_data_response(data_visualizer.productivity_heatmap_data(analytics_data))
+    
+    heatmap = _render_charts(
+        'productivity_heatmap', analytics_data,
+        lambda: data_visualizer.productivity_heatmap_data(analytics_data), ('workspace', workspace_id)
+    )
+    
+    return render_template('analytics/productivity_heatmap.html', heatmap=heatmap, workspace_id=workspace_id)
+
+# Response settings for each streamed export format
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
 @bp.route('/analytics/export-data')
 @login_required
 def export_data():
+    export_format = request.args.get('format', 'json')
+    compress = request.args.get('compress') == 'gzip'
+    if export_format not in EXPORT_FORMATS:
+        abort(400, f'Unsupported export format: {export_format}')
+    
     # Get user's analytics
     analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
     
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    # Prepare export data
-    export_data = {
-        'analytics': analytics.to_dict(),
-        'tasks': [task.to_dict() for task in tasks],
-        'export_date': datetime.utcnow().isoformat()
-    }
-    
-    return jsonify(export_data)
+    # Stream tasks straight from the cursor instead of materializing them
+    if export_format in ('arrow', 'parquet'):
+        body = export.stream_columnar(current_user.id, export_format)
+    elif export_format == 'ndjson':
+        body = export.stream_ndjson(export.iter_task_records(current_user.id))
+    elif export_format == 'csv':
+        body = export.stream_csv(export.iter_task_records(current_user.id))
+    else:
+        body = export.stream_json(export.iter_task_records(current_user.id), analytics.to_dict())
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    headers = {}
+    if compress:
+        body = export.gzip_stream(body)
+        mimetype = 'application/gzip'
+        extension += '.gz'
+    if compress or export_format != 'json':
+        filename = f"opal-export-{datetime.utcnow().strftime('%Y%m%d')}.{extension}"
+        headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
 
 @bp.route('/analytics/suggestions')
 @login_required
@@ -158,11 +357,8 @@ def get_suggestions():
     # Get user's analytics
     analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
     
-    # Get all tasks
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    # Pattern analysis reads the cached task frame's codes directly
+    task_data = task_store.get(current_user.id)
     
     # Analyze patterns
     patterns = ml_engine.analyze_task_patterns(task_data)
@@ -1,10 +1,13 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
-from app import db
+from app import db, identity_cache
 from models.user import User
 from models.analytics import UserAnalytics
 from werkzeug.security import generate_password_hash
+from utils.password_hasher import PasswordHasherBusy
+from utils.account_deletion import delete_account as delete_account_data
 from datetime import datetime
+import math
 
 bp = Blueprint('auth', __name__)
 
@@ -58,8 +61,13 @@ def login():
         user = User.query.filter_by(username=username).first()
         
         if user and user.verify_password(password):
+            # Upgrade hashes made with an older work factor while we have the password
+            if user.needs_rehash():
+                user.password = password
+            
             login_user(user, remember=remember)
             user.update_last_login()
+            identity_cache.invalidate(user.id)
             
             # Redirect to the page the user was trying to access
             next_page = request.args.get('next')
@@ -71,6 +79,24 @@ def login():
     
     return render_template('auth/login.html')
 
+# Page shown again when password hashing is saturated, by endpoint
+BUSY_TEMPLATES = {
+    'auth.login': 'auth/login.html',
+    'auth.register': 'auth/register.html',
+    'auth.change_password': 'auth/profile.html',
+    'auth.delete_account': 'auth/profile.html'
+}
+
+@bp.app_errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    headers = {'Retry-After': str(max(1, math.ceil(current_app.config['PASSWORD_HASH_TIMEOUT'])))}
+    template = BUSY_TEMPLATES.get(request.endpoint)
+    if template is None or request.accept_mimetypes.best == 'application/json':
+        return jsonify({'error': 'The server is busy, please try again in a moment'}), 503, headers
+    
+    flash('The server is busy, please try again in a moment', 'error')
+    return render_template(template), 503, headers
+
 @bp.route('/logout')
 @login_required
 def logout():
@@ -96,6 +122,7 @@ def profile():
         current_user.preferred_working_hours = working_hours
         
         db.session.commit()
+        identity_cache.invalidate(current_user.id)
         flash('Profile updated successfully', 'success')
         return redirect(url_for('auth.profile'))
     
@@ -118,6 +145,7 @@ def change_password():
     
     current_user.password = new_password
     db.session.commit()
+    identity_cache.invalidate(current_user.id)
     
     flash('Password changed successfully', 'success')
     return redirect(url_for('auth.profile'))
@@ -129,13 +157,13 @@ def delete_account():
         flash('Password is incorrect', 'error')
         return redirect(url_for('auth.profile'))
     
-    # Delete user's analytics
-    UserAnalytics.query.filter_by(user_id=current_user.id).delete()
-    
-    # Delete user
-    db.session.delete(current_user)
-    db.session.commit()
-    
+    user_id = current_user.id
     logout_user()
-    flash('Your account has been deleted', 'success')
+    
+    # Delete the user's dependencies, tasks, analytics and account with
+    # set-based statements; very large accounts are deleted in the background
+    if delete_account_data(current_app._get_current_object(), user_id):
+        flash('Your account has been deactivated and will be deleted shortly', 'success')
+    else:
+        flash('Your account has been deleted', 'success')
     return redirect(url_for('auth.login')) 
\ No newline at end of file
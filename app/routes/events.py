@@ -0,0 +1,21 @@
+from flask import Blueprint, Response
+from flask_login import login_required, current_user
+from app import event_broker
+
+bp = Blueprint('events', __name__)
+
+@bp.route('/events/stream')
+@login_required
+def event_stream():
+    # The generator only needs the user id; it deliberately runs outside the
+    # request context so the stream does not pin a database session
+    user_id = current_user.id
+    
+    return Response(
+        event_broker.stream(user_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
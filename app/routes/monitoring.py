@@ -0,0 +1,116 @@
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from flask_login import current_user
+from app import figure_cache, identity_cache, event_broker, password_hasher, task_store, workspace_store
+from utils.instrumentation import render_metrics
+from utils.profiler import SamplingProfiler, ProfilerBusy, to_collapsed, to_speedscope
+from datetime import datetime
+import hmac
+import math
+
+bp = Blueprint('monitoring', __name__)
+profiler = SamplingProfiler()
+
+# Upper bounds for a single profile request
+MAX_PROFILE_SECONDS = 60
+MIN_PROFILE_INTERVAL_MS = 1
+MAX_PROFILE_INTERVAL_MS = 1000
+
+def _require_metrics_token():
+    """Reject scrapes without the bearer token when METRICS_TOKEN is set"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return
+    if not _bearer_token_matches(token):
+        abort(401)
+
+def _bearer_token_matches(token):
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(token) and hmac.compare_digest(supplied, token)
+
+def _require_profiler_access():
+    """Allow profiling only when enabled, for the token or listed users"""
+    if not current_app.config['PROFILER_ENABLED']:
+        abort(404)
+    if _bearer_token_matches(current_app.config.get('PROFILER_TOKEN')):
+        return
+    if current_user.is_authenticated and current_user.username in current_app.config['PROFILER_ALLOWED_USERS']:
+        return
+    abort(403)
+
+def _samples():
+    """Current values of the in-process caches, queues and pools"""
+    hasher = password_hasher.stats()
+    figures = figure_cache.stats()
+    identities = identity_cache.stats()
+    events = event_broker.stats()
+    frames = task_store.stats()
+    workspaces = workspace_store.stats()
+    
+    return [
+        ('opal_password_hash_queue_depth', 'gauge', 'Password hash operations waiting for a worker.',
+         hasher['queue_depth']),
+        ('opal_password_hash_running', 'gauge', 'Password hash operations running.', hasher['running']),
+        ('opal_password_hash_completed_total', 'counter', 'Password hash operations completed.',
+         hasher['completed']),
+        ('opal_password_hash_rejected_total', 'counter', 'Password hash operations rejected for backpressure.',
+         hasher['rejected']),
+        ('opal_password_hash_latency_p95_seconds', 'gauge', 'Recent 95th percentile password hash latency.',
+         hasher['latency_p95_ms'] / 1000),
+        ('opal_figure_cache_entries', 'gauge', 'Serialized figures in the figure cache.', figures['entries']),
+        ('opal_figure_cache_hits_total', 'counter', 'Figure cache hits.', figures['hits']),
+        ('opal_figure_cache_misses_total', 'counter', 'Figure cache misses.', figures['misses']),
+        ('opal_task_store_entries', 'gauge', 'Users with a cached task frame.', frames['entries']),
+        ('opal_task_store_bytes', 'gauge', 'Approximate memory held by cached task frames.', frames['bytes']),
+        ('opal_task_store_rebuilds_total', 'counter', 'Task frames built from a full query.', frames['rebuilds']),
+        ('opal_task_store_refreshes_total', 'counter', 'Task frames updated from changed rows only.',
+         frames['refreshes']),
+        ('opal_workspace_store_entries', 'gauge', 'Workspaces with a cached analytics rollup.',
+         workspaces['entries']),
+        ('opal_workspace_store_hits_total', 'counter', 'Workspace rollups served from memory.', workspaces['hits']),
+        ('opal_workspace_store_misses_total', 'counter', 'Workspace rollups aggregated from the database.',
+         workspaces['misses']),
+        ('opal_identity_cache_hits_total', 'counter', 'Logged-in users served from the identity cache.',
+         identities['hits']),
+        ('opal_identity_cache_misses_total', 'counter', 'Logged-in users loaded from the database.',
+         identities['misses']),
+        ('opal_event_streams', 'gauge', 'Open server-sent event streams.', events['streams']),
+        ('opal_events_dropped_total', 'counter', 'Events dropped for slow streams.', events['dropped']),
+    ]
+
+@bp.route('/metrics')
+def metrics():
+    _require_metrics_token()
+    return Response(render_metrics(_samples()), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/debug/profile')
+def profile():
+    """Sample this worker's threads and return collapsed stacks or a speedscope file
+    
+    Other threads of the same process are sampled, so this is useful with
+    threaded workers while they serve real traffic.
+    """
+    _require_profiler_access()
+    
+    seconds = request.args.get('seconds', 10, type=float)
+    interval = request.args.get('interval', 5, type=float)
+    if not (math.isfinite(seconds) and math.isfinite(interval)):
+        abort(400, 'seconds and interval must be finite numbers')
+    seconds = min(seconds, MAX_PROFILE_SECONDS)
+    interval = min(max(interval, MIN_PROFILE_INTERVAL_MS), MAX_PROFILE_INTERVAL_MS) / 1000
+    output = request.args.get('format', 'collapsed')
+    include_idle = request.args.get('idle') == 'true'
+    if output not in ('collapsed', 'speedscope'):
+        abort(400, f'Unsupported profile format: {output}')
+    
+    try:
+        stacks = profiler.sample(seconds, interval, include_idle)
+    except ProfilerBusy:
+        abort(409, 'A profile is already running in this worker')
+    
+    if output == 'speedscope':
+        name = f"opal-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}"
+        response = jsonify(to_speedscope(stacks, interval, name))
+        response.headers['Content-Disposition'] = f'attachment; filename="{name}.speedscope.json"'
+        return response
+    
+    return Response(to_collapsed(stacks), mimetype='text/plain')
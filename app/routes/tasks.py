@@ -1,44 +1,156 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, current_app
 from flask_login import login_required, current_user
-from app import db
+from app import db, figure_cache, event_broker, task_store, workspace_store
 from models.task import Task, TaskDependency
 from models.analytics import UserAnalytics
-from utils.nlp_processor import NLPProcessor
-from utils.ml_engine import MLEngine
+from utils.lazy import LazyInstance
+from utils.enrichment import EnrichmentWorker
+from utils.task_serializer import SUMMARY_COLUMNS, json_response, to_records
+from sqlalchemy.orm import load_only
 from datetime import datetime
+import base64
 import json
 
 bp = Blueprint('tasks', __name__)
-nlp_processor = NLPProcessor()
-ml_engine = MLEngine()
+nlp_processor = LazyInstance('utils.nlp_processor', 'NLPProcessor', stage='nlp')
+ml_engine = LazyInstance('utils.ml_engine', 'MLEngine', stage='ml')
 
-@bp.route('/tasks')
-@login_required
-def task_list():
+def _after_task_write(user_id, event=None, data=None):
+    """Drop per-user derived state once a user's tasks have changed
+    
+    When an event name is given it is also pushed, with its delta, to the
+    user's open event streams.
+    """
+    figure_cache.invalidate_user(user_id)
+    task_store.mark_stale(user_id)
+    workspace_store.invalidate_user(user_id)
+    if event:
+        event_broker.publish(user_id, event, data)
+
+def _after_enrichment(user_id, tasks):
+    _after_task_write(user_id, 'task.enriched', {'tasks': tasks})
+
+enrichment_worker = EnrichmentWorker(nlp_processor, ml_engine, on_enriched=_after_enrichment)
+
+# Columns needed to render a task list row; heavy columns such as
+# description, keywords and tags are only loaded on the detail pages
+LIST_COLUMNS = SUMMARY_COLUMNS
+
+def _encode_cursor(task):
+    """Encode the (due_date, id) keyset position of a task as an opaque cursor"""
+    due_date = task.due_date.isoformat() if task.due_date else None
+    payload = json.dumps([due_date, task.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def _decode_cursor(cursor):
+    """Decode a cursor produced by _encode_cursor into (due_date, id)"""
+    try:
+        due_date, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (datetime.fromisoformat(due_date) if due_date else None), int(task_id)
+    except (ValueError, TypeError):
+        abort(400, 'Invalid cursor')
+
+def _task_page(rows=False):
+    """Return one keyset page of the current user's filtered tasks
+    
+    Tasks are ordered by (due_date, id) with undated tasks last, so each page
+    is a bounded index range scan regardless of how many tasks the user has.
+    With ``rows`` the page holds plain row tuples instead of Task objects.
+    """
     status = request.args.get('status', 'all')
     category = request.args.get('category', 'all')
     priority = request.args.get('priority', 'all')
+    cursor = request.args.get('cursor')
+    per_page = request.args.get('per_page', current_app.config['TASKS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['TASKS_MAX_PER_PAGE']))
     
     # Base query
-    query = Task.query.filter_by(user_id=current_user.id)
+    if rows:
+        query = db.session.query(*LIST_COLUMNS).filter(Task.user_id == current_user.id)
+    else:
+        query = Task.query.filter_by(user_id=current_user.id).options(load_only(*LIST_COLUMNS))
     
     # Apply filters
     if status != 'all':
-        query = query.filter_by(status=status)
+        query = query.filter(Task.status == status)
     if category != 'all':
-        query = query.filter_by(category=category)
+        query = query.filter(Task.category == category)
     if priority != 'all':
-        query = query.filter_by(priority=int(priority))
-    
-    tasks = query.order_by(Task.due_date.asc()).all()
-    return render_template('tasks/list.html', tasks=tasks)
+        query = query.filter(Task.priority == int(priority))
+    
+    # Resume after the last row of the previous page
+    if cursor:
+        due_date, task_id = _decode_cursor(cursor)
+        if due_date is None:
+            query = query.filter(Task.due_date.is_(None), Task.id > task_id)
+        else:
+            query = query.filter(db.or_(
+                Task.due_date > due_date,
+                db.and_(Task.due_date == due_date, Task.id > task_id),
+                Task.due_date.is_(None)
+            ))
+    
+    # Fetch one extra row to know whether another page follows
+    tasks = query.order_by(
+        Task.due_date.asc().nulls_last(), Task.id.asc()
+    ).limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(tasks) > per_page:
+        tasks = tasks[:per_page]
+        next_cursor = _encode_cursor(tasks[-1])
+    
+    return tasks, next_cursor
+
+@bp.route('/tasks')
+@login_required
+def task_list():
+    tasks, next_cursor = _task_page()
+    return render_template('tasks/list.html', tasks=tasks, next_cursor=next_cursor)
+
+@bp.route('/api/tasks')
+@login_required
+def task_list_api():
+    rows, next_cursor = _task_page(rows=True)
+    return json_response({
+        'tasks': to_records(rows, LIST_COLUMNS, iso_dates=False),
+        'next_cursor': next_cursor
+    })
 
 @bp.route('/tasks/create', methods=['GET', 'POST'])
 @login_required
 def create_task():
     if request.method == 'POST':
+        description = (request.form.get('description') or '').strip()
+        if not description:
+            flash('A task description is required', 'error')
+            return render_template('tasks/create.html'), 400
+        
+        intake_mode = current_app.config['TASK_INTAKE_MODE']
+        
+        if intake_mode != 'sync':
+            # Store the raw input with one INSERT; NLP and ML fields and the
+            # creation counter are filled in by the enrichment worker
+            task = Task(
+                title=description.split('\n', 1)[0][:50],
+                description=description,
+                enrichment_state='pending',
+                user_id=current_user.id
+            )
+            db.session.add(task)
+            db.session.flush()
+            event = {'task': task.to_summary_dict()}
+            db.session.commit()
+            _after_task_write(current_user.id, 'task.created', event)
+            
+            if intake_mode == 'async':
+                enrichment_worker.notify(current_app._get_current_object())
+            
+            flash('Task created successfully', 'success')
+            return redirect(url_for('tasks.task_list'))
+        
         # Process natural language input
-        task_data = nlp_processor.process_task_input(request.form.get('description'))
+        task_data = nlp_processor.process_task_input(description)
         
         # Create new task
         task = Task(
@@ -61,7 +173,10 @@ def create_task():
         analytics.total_tasks_created += 1
         
         db.session.add(task)
+        db.session.flush()
+        event = {'task': task.to_summary_dict(), 'counters': analytics.get_counters()}
         db.session.commit()
+        _after_task_write(current_user.id, 'task.created', event)
         
         flash('Task created successfully', 'success')
         return redirect(url_for('tasks.task_list'))
@@ -105,7 +220,9 @@ def edit_task(task_id):
         tags = request.form.get('tags', '').split(',')
         task.tags = json.dumps([tag.strip() for tag in tags if tag.strip()])
         
+        event = {'task': task.to_summary_dict()}
         db.session.commit()
+        _after_task_write(current_user.id, 'task.updated', event)
         flash('Task updated successfully', 'success')
         return redirect(url_for('tasks.view_task', task_id=task.id))
     
@@ -119,8 +236,16 @@ def delete_task(task_id):
         flash('Access denied', 'error')
         return redirect(url_for('tasks.task_list'))
     
+    # Remove links explicitly so SQLite, which does not enforce the
+    # ON DELETE rules by default, does not keep orphaned rows
+    TaskDependency.query.filter(
+        db.or_(TaskDependency.task_id == task_id, TaskDependency.dependent_task_id == task_id)
+    ).delete(synchronize_session=False)
+    Task.query.filter_by(parent_id=task_id).update({'parent_id': None}, synchronize_session=False)
+    
     db.session.delete(task)
     db.session.commit()
+    _after_task_write(current_user.id, 'task.deleted', {'ids': [task_id]})
     
     flash('Task deleted successfully', 'success')
     return redirect(url_for('tasks.task_list'))
@@ -133,14 +258,16 @@ def complete_task(task_id):
         flash('Access denied', 'error')
         return redirect(url_for('tasks.task_list'))
     
-    task.status = 'completed'
-    task.completed_at = datetime.utcnow()
+    now = datetime.utcnow()
+    task.mark_completed(now, current_user.to_local(now))
     
     # Update analytics
     analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
     analytics.update_completion_metrics(task)
     
+    event = {'task': task.to_summary_dict(), 'counters': analytics.get_counters()}
     db.session.commit()
+    _after_task_write(current_user.id, 'task.completed', event)
     flash('Task marked as completed', 'success')
     return redirect(url_for('tasks.task_list'))
 
@@ -162,6 +289,7 @@ def add_dependency(task_id):
     try:
         task.add_dependency(dependent_task)
         db.session.commit()
+        _after_task_write(current_user.id, 'task.dependencies_changed', {'ids': [task_id]})
         flash('Dependency added successfully', 'success')
     except ValueError as e:
         flash(str(e), 'error')
@@ -179,6 +307,7 @@ def remove_dependency(task_id, dependent_task_id):
     dependent_task = Task.query.get_or_404(dependent_task_id)
     task.remove_dependency(dependent_task)
     db.session.commit()
+    _after_task_write(current_user.id, 'task.dependencies_changed', {'ids': [task_id]})
     
     flash('Dependency removed successfully', 'success')
     return redirect(url_for('tasks.view_task', task_id=task.id))
@@ -188,36 +317,26 @@ def remove_dependency(task_id, dependent_task_id):
 def suggest_schedule():
     available_hours = int(request.args.get('hours', 8))
     
-    # Get all pending tasks
-    tasks = Task.query.filter_by(
-        user_id=current_user.id,
-        status='pending'
-    ).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    # Get all pending tasks from the user's cached task frame
+    frame = task_store.get(current_user.id)
+    task_data = frame.to_pandas(mask=frame.where('status', 'pending'))
     
     # Get suggested schedule
     schedule = ml_engine.suggest_optimal_schedule(task_data, available_hours)
     
-    return jsonify(schedule)
+    return json_response(schedule)
 
 @bp.route('/tasks/analyze-conflicts', methods=['GET'])
 @login_required
 def analyze_conflicts():
-    # Get all pending tasks
-    tasks = Task.query.filter_by(
-        user_id=current_user.id,
-        status='pending'
-    ).all()
-    
-    # Convert tasks to dictionary format
-    task_data = [task.to_dict() for task in tasks]
+    # Get all pending tasks from the user's cached task frame
+    frame = task_store.get(current_user.id)
+    task_data = frame.to_pandas(mask=frame.where('status', 'pending'))
     
     # Detect conflicts
     conflicts = ml_engine.detect_task_conflicts(task_data)
     
-    return jsonify(conflicts)
+    return json_response(conflicts)
 
 @bp.route('/tasks/bulk-update', methods=['POST'])
 @login_required
@@ -229,28 +348,63 @@ def bulk_update():
         flash('No tasks selected', 'error')
         return redirect(url_for('tasks.task_list'))
     
-    tasks = Task.query.filter(
+    # Every write below is a single set-based statement over this selection
+    selected = Task.query.filter(
+        Task.id.in_(task_ids),
+        Task.user_id == current_user.id
+    )
+    selected_ids = db.select(Task.id).where(
         Task.id.in_(task_ids),
         Task.user_id == current_user.id
-    ).all()
+    )
+    event = {'action': action, 'ids': db.session.scalars(selected_ids).all()}
     
     if action == 'complete':
-        for task in tasks:
-            task.status = 'completed'
-            task.completed_at = datetime.utcnow()
-            
-            # Update analytics
-            analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
-            analytics.update_completion_metrics(task)
+        now = datetime.utcnow()
+        local_now = current_user.to_local(now)
+        pending = selected.filter(Task.status != 'completed')
+        
+        # Load only the columns the analytics fold needs, and skip tasks that
+        # are already completed so they are not counted twice
+        completed = pending.with_entities(
+            Task.category, Task.tags, Task.complexity_score, Task.actual_duration
+        ).all()
+        
+        pending.update(
+            {
+                'status': 'completed', 'completed_at': now, 'updated_at': now,
+                'completed_local_hour': local_now.hour, 'completed_local_weekday': local_now.weekday()
+            },
+            synchronize_session=False
+        )
+        
+        # Update analytics with one aggregated delta, bucketed in local time
+        analytics = UserAnalytics.query.filter_by(user_id=current_user.id).first()
+        analytics.update_bulk_completion_metrics(completed, completed_at=local_now)
+        event['counters'] = analytics.get_counters()
     
     elif action == 'delete':
-        for task in tasks:
-            db.session.delete(task)
+        TaskDependency.query.filter(
+            db.or_(
+                TaskDependency.task_id.in_(selected_ids),
+                TaskDependency.dependent_task_id.in_(selected_ids)
+            )
+        ).delete(synchronize_session=False)
+        
+        # Detach subtasks of deleted parents instead of leaving dangling references
+        Task.query.filter(Task.parent_id.in_(selected_ids)).update(
+            {'parent_id': None}, synchronize_session=False
+        )
+        
+        selected.delete(synchronize_session=False)
     
     elif action == 'archive':
-        for task in tasks:
-            task.status = 'archived'
+        selected.update(
+            {'status': 'archived', 'updated_at': datetime.utcnow()},
+            synchronize_session=False
+        )
     
     db.session.commit()
+    _after_task_write(current_user.id, 'tasks.bulk_updated', event)
     flash(f'Tasks {action}d successfully', 'success')
-    return redirect(url_for('tasks.task_list')) 
\ No newline at end of file
+    return redirect(url_for('tasks.task_list'))
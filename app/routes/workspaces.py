@@ -0,0 +1,136 @@
+from flask import Blueprint, jsonify, request, abort
+from flask_login import login_required, current_user
+from app import db, workspace_store
+from models.user import User
+from models.workspace import Workspace, WorkspaceMember
+
+bp = Blueprint('workspaces', __name__)
+
+def _owned_workspace_or_404(workspace_id):
+    """Load a workspace the current user may manage
+
+    Non-members get a 404 so workspace ids are not disclosed; members who
+    are not the owner get a 403.
+    """
+    workspace = Workspace.query.get_or_404(workspace_id)
+    if workspace.owner_id != current_user.id:
+        if not WorkspaceMember.is_member(workspace_id, current_user.id):
+            abort(404)
+        abort(403)
+    return workspace
+
+@bp.route('/workspaces')
+@login_required
+def list_workspaces():
+    workspaces = Workspace.query.join(
+        WorkspaceMember, WorkspaceMember.workspace_id == Workspace.id
+    ).filter(
+        WorkspaceMember.user_id == current_user.id, WorkspaceMember.status == 'active'
+    ).order_by(Workspace.name).all()
+    return jsonify([workspace.to_dict() for workspace in workspaces])
+
+@bp.route('/workspaces/invites')
+@login_required
+def list_invites():
+    workspaces = Workspace.query.join(
+        WorkspaceMember, WorkspaceMember.workspace_id == Workspace.id
+    ).filter(
+        WorkspaceMember.user_id == current_user.id, WorkspaceMember.status == 'invited'
+    ).order_by(Workspace.name).all()
+    return jsonify([workspace.to_dict() for workspace in workspaces])
+
+@bp.route('/workspaces', methods=['POST'])
+@login_required
+def create_workspace():
+    name = (request.form.get('name') or '').strip()
+    if not name:
+        abort(400, 'A workspace name is required')
+
+    workspace = Workspace(name=name[:100], owner_id=current_user.id)
+    db.session.add(workspace)
+    db.session.flush()
+    owner = WorkspaceMember(workspace_id=workspace.id, user_id=current_user.id, role='owner')
+    owner.accept()
+    db.session.add(owner)
+    db.session.commit()
+    return jsonify(workspace.to_dict()), 201
+
+@bp.route('/workspaces/<int:workspace_id>/members')
+@login_required
+def list_members(workspace_id):
+    if not WorkspaceMember.is_member(workspace_id, current_user.id):
+        abort(404)
+
+    members = db.session.execute(
+        db.select(User.id, User.username, WorkspaceMember.role, WorkspaceMember.joined_at)
+        .join(WorkspaceMember, WorkspaceMember.user_id == User.id)
+        .where(WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.status == 'active')
+        .order_by(User.username)
+    ).all()
+    return jsonify([
+        {'user_id': user_id, 'username': username, 'role': role, 'joined_at': joined_at.isoformat()}
+        for user_id, username, role, joined_at in members
+    ])
+
+@bp.route('/workspaces/<int:workspace_id>/members', methods=['POST'])
+@login_required
+def invite_member(workspace_id):
+    """Invite a user by username; they join only once they accept
+
+    The response is the same whether or not the username exists or is
+    already invited, so it cannot be used to probe for accounts.
+    """
+    _owned_workspace_or_404(workspace_id)
+
+    username = request.form.get('username')
+    user = User.query.filter_by(username=username).first() if username else None
+    if user is not None and not WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, user_id=user.id
+    ).first():
+        db.session.add(WorkspaceMember(workspace_id=workspace_id, user_id=user.id))
+        db.session.commit()
+    return jsonify({'invited': username}), 202
+
+@bp.route('/workspaces/<int:workspace_id>/accept', methods=['POST'])
+@login_required
+def accept_invite(workspace_id):
+    invite = WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, user_id=current_user.id, status='invited'
+    ).first_or_404()
+    invite.accept()
+    db.session.commit()
+    workspace_store.invalidate(workspace_id)
+    return jsonify(invite.workspace.to_dict())
+
+@bp.route('/workspaces/<int:workspace_id>/members/<int:user_id>/remove', methods=['POST'])
+@login_required
+def remove_member(workspace_id, user_id):
+    # Members may leave and invitees decline on their own; anyone else
+    # needs the owner
+    if user_id != current_user.id:
+        workspace = _owned_workspace_or_404(workspace_id)
+    else:
+        workspace = Workspace.query.get_or_404(workspace_id)
+    if user_id == workspace.owner_id:
+        abort(400, 'The owner cannot leave; delete the workspace instead')
+
+    removed = WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, user_id=user_id
+    ).delete(synchronize_session=False)
+    if not removed:
+        abort(404)
+    db.session.commit()
+    workspace_store.invalidate(workspace_id)
+    return jsonify({'removed': user_id})
+
+@bp.route('/workspaces/<int:workspace_id>/delete', methods=['POST'])
+@login_required
+def delete_workspace(workspace_id):
+    _owned_workspace_or_404(workspace_id)
+
+    # Remove members explicitly for SQLite, which does not enforce ON DELETE
+    WorkspaceMember.query.filter_by(workspace_id=workspace_id).delete(synchronize_session=False)
+    Workspace.query.filter_by(id=workspace_id).delete(synchronize_session=False)
+    db.session.commit()
+    workspace_store.invalidate(workspace_id)
+    return jsonify({'deleted': workspace_id})
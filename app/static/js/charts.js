@@ -0,0 +1,151 @@
+// Draws analytics charts in the browser from the compact chart data returned
+// by DataVisualizer's *_data methods (?format=data). The layouts mirror the
+// server-side Plotly figures so both rendering modes look the same.
+const OpalCharts = (function() {
+    const palette = [
+        'rgb(141,211,199)', 'rgb(255,255,179)', 'rgb(190,186,218)', 'rgb(251,128,114)',
+        'rgb(128,177,211)', 'rgb(253,180,98)', 'rgb(179,222,105)', 'rgb(252,205,229)',
+        'rgb(217,217,217)', 'rgb(188,128,189)', 'rgb(204,235,197)', 'rgb(255,237,111)'
+    ];
+    const weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+    const baseLayout = {
+        paper_bgcolor: 'white',
+        plot_bgcolor: 'white',
+        xaxis: {gridcolor: 'rgb(235,240,248)'},
+        yaxis: {gridcolor: 'rgb(235,240,248)'}
+    };
+
+    function layout(extra) {
+        return Object.assign({}, baseLayout, extra);
+    }
+
+    function axes(title, xTitle, yTitle, extra) {
+        return layout(Object.assign({
+            title: title,
+            xaxis: Object.assign({}, baseLayout.xaxis, {title: xTitle}),
+            yaxis: Object.assign({}, baseLayout.yaxis, {title: yTitle})
+        }, extra || {}));
+    }
+
+    function gauge(chart) {
+        return {
+            data: [{
+                type: 'indicator',
+                mode: 'gauge+number',
+                value: chart.value,
+                title: {text: chart.title},
+                gauge: {
+                    axis: {range: [0, 100]},
+                    bar: {color: palette[0]},
+                    steps: [
+                        {range: [0, 33], color: 'lightgray'},
+                        {range: [33, 66], color: 'gray'},
+                        {range: [66, 100], color: 'darkgray'}
+                    ],
+                    threshold: {line: {color: 'red', width: 4}, thickness: 0.75, value: 90}
+                }
+            }],
+            layout: layout({height: 300})
+        };
+    }
+
+    const specs = {
+        completion_rate: function(chart) {
+            return {
+                data: [{type: 'scatter', y: chart.y, mode: 'lines+markers', name: 'Completion Rate',
+                        line: {color: palette[0], width: 2}}],
+                layout: axes('Task Completion Rate', 'Time', 'Completion Rate (%)')
+            };
+        },
+        category_distribution: function(chart) {
+            return {
+                data: [{type: 'pie', labels: chart.labels, values: chart.values, hole: 0.3,
+                        marker: {colors: palette}}],
+                layout: layout({title: 'Task Distribution by Category'})
+            };
+        },
+        productivity_by_hour: function(chart) {
+            return {
+                data: [{type: 'bar', x: chart.x, y: chart.y, marker: {color: palette[2]}}],
+                layout: axes('Productivity by Hour of Day', 'Hour', 'Productivity Score')
+            };
+        },
+        complexity_distribution: function(chart) {
+            return {
+                data: [{type: 'bar', x: chart.x, y: chart.y, marker: {color: palette[3]}}],
+                layout: axes('Task Complexity Distribution', 'Complexity Score', 'Number of Tasks')
+            };
+        },
+        task_timeline: function(chart) {
+            return {
+                data: chart.series.map(function(series, index) {
+                    return {
+                        type: 'bar', orientation: 'h', x: series.x, y: series.y, name: series.name,
+                        customdata: series.priority, marker: {color: palette[index % palette.length]},
+                        hovertemplate: '<b>%{y}</b><br>Duration: %{x} minutes<br>Priority: %{customdata}<br><extra></extra>'
+                    };
+                }),
+                layout: axes(chart.title, 'Duration (minutes)', 'Task', {barmode: 'overlay', showlegend: true})
+            };
+        },
+        productivity_heatmap: function(chart) {
+            return {
+                data: [{type: 'heatmap', z: chart.z, x: weekdays, y: Array.from({length: 24}, (_, hour) => hour),
+                        colorscale: 'Viridis'}],
+                layout: axes('Productivity Heatmap', 'Day', 'Hour')
+            };
+        },
+        gauge: gauge,
+        streak_counter: function(chart) {
+            return {
+                data: [
+                    {type: 'indicator', mode: 'number', value: chart.current, title: {text: 'Current Streak'},
+                     domain: {row: 0, column: 0}},
+                    {type: 'indicator', mode: 'number', value: chart.longest, title: {text: 'Longest Streak'},
+                     domain: {row: 0, column: 1}}
+                ],
+                layout: layout({grid: {rows: 1, columns: 2}, height: 200})
+            };
+        },
+        status_distribution: function(chart) {
+            return {
+                data: [{type: 'pie', labels: chart.labels, values: chart.values, hole: 0.3,
+                        marker: {colors: palette}}],
+                layout: layout({title: 'Task Status Distribution'})
+            };
+        },
+        priority_distribution: function(chart) {
+            return {
+                data: [{type: 'bar', x: chart.x, y: chart.y, marker: {color: palette[1]}}],
+                layout: axes('Task Priority Distribution', 'Priority Level', 'Number of Tasks')
+            };
+        },
+        duration_analysis: function(chart) {
+            const data = [{type: 'box', y: chart.estimated, name: 'Estimated Duration', marker: {color: palette[2]}}];
+            if (chart.actual !== null) {
+                data.push({type: 'box', y: chart.actual, name: 'Actual Duration', marker: {color: palette[3]}});
+            }
+            return {data: data, layout: axes('Task Duration Analysis', null, 'Duration (minutes)')};
+        },
+        category_analysis: function(chart) {
+            return {
+                data: chart.series.map(function(series, index) {
+                    return {type: 'bar', x: chart.categories, y: series.y, name: series.name,
+                            marker: {color: palette[index % palette.length]}};
+                }),
+                layout: axes('Task Category Analysis', 'Category', 'Number of Tasks', {barmode: 'stack'})
+            };
+        }
+    };
+
+    function build(chart) {
+        return specs[chart.spec](chart);
+    }
+
+    function render(element, chart) {
+        const figure = build(chart);
+        Plotly.newPlot(element, figure.data, figure.layout, {responsive: true});
+    }
+
+    return {specs: specs, build: build, render: render};
+})();
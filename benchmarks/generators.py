@@ -0,0 +1,137 @@
+"""Synthetic task data for the benchmarks
+
+Everything is generated from a seed so runs at the same size are comparable
+across commits.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import json
+import random
+
+CATEGORIES = ['work', 'personal', 'health', 'learning', 'finance', 'social', 'travel', 'other']
+STATUSES = ['pending', 'in_progress', 'completed', 'completed', 'completed', 'archived']
+TAGS = ['urgent', 'home', 'office', 'weekly', 'blocked', 'quick', 'review', 'errand']
+
+DESCRIPTION_TEMPLATES = [
+    'Prepare the {noun} presentation for the project meeting tomorrow, about {hours} hours',
+    'Book a flight and hotel for the {noun} trip next week',
+    'Go to the gym and finish a {minutes} minutes workout today',
+    'Pay the {noun} bill and update the monthly budget',
+    'Read two chapters of the {noun} course and practice the exercises',
+    'Call family about the {noun} party next month',
+    'Write the quarterly {noun} report and email it to the team by 12/03/2025',
+    'Review the {noun} pull request, it is urgent and blocks the release'
+]
+NOUNS = ['marketing', 'insurance', 'python', 'design', 'budget', 'birthday', 'research', 'security']
+
+def generate_descriptions(count: int, seed: int = 0) -> List[str]:
+    """Natural-language task inputs like the ones typed into the create form"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(DESCRIPTION_TEMPLATES).format(
+            noun=rng.choice(NOUNS), hours=rng.randint(1, 6), minutes=rng.choice([20, 30, 45, 60])
+        )
+        for _ in range(count)
+    ]
+
+def generate_tasks(count: int, seed: int = 0, now: Optional[datetime] = None) -> List[Dict]:
+    """Task dicts shaped like Task.to_dict() plus the NLP fields the ML engine reads
+
+    Dates are datetimes rather than ISO strings, as the ML engine expects.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2025, 6, 1, 9, 0)
+    tasks = []
+
+    for task_id in range(1, count + 1):
+        created_at = now - timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+        status = rng.choice(STATUSES)
+        completed_at = None
+        actual_duration = None
+        if status == 'completed':
+            completed_at = created_at + timedelta(minutes=rng.randint(10, 14 * 24 * 60))
+            actual_duration = rng.randint(5, 480)
+
+        tasks.append({
+            'id': task_id,
+            'title': f'Task {task_id}',
+            'description': f'Synthetic task {task_id}',
+            'status': status,
+            'priority': rng.randint(0, 5),
+            'due_date': created_at + timedelta(days=rng.randint(0, 30), hours=rng.randint(0, 23)),
+            'created_at': created_at,
+            'updated_at': completed_at or created_at,
+            'completed_at': completed_at,
+            'category': rng.choice(CATEGORIES),
+            'complexity_score': round(rng.random(), 3),
+            'sentiment_score': round(rng.uniform(-1, 1), 3),
+            'keywords': rng.sample(NOUNS, rng.randint(1, 4)),
+            'tags': rng.sample(TAGS, rng.randint(0, 3)),
+            'estimated_duration': rng.choice([15, 30, 60, 90, 120, 240]),
+            'actual_duration': actual_duration,
+            'is_completed': status == 'completed',
+            'is_overdue': False
+        })
+
+    return tasks
+
+def fold_analytics(tasks: List[Dict]):
+    """Fold generated tasks into an unsaved UserAnalytics
+
+    Needs an app context, since the model imports the app.
+    """
+    from models.analytics import UserAnalytics
+
+    analytics = UserAnalytics(
+        total_tasks_created=len(tasks), total_tasks_completed=0,
+        total_productive_time=0, current_streak=0, longest_streak=0
+    )
+    completed = [SimpleNamespace(**task) for task in tasks if task['status'] == 'completed']
+    analytics.update_bulk_completion_metrics(completed)
+    return analytics
+
+def build_analytics(tasks: List[Dict]) -> Dict:
+    """Fold generated tasks into UserAnalytics and return its to_dict()"""
+    return fold_analytics(tasks).to_dict()
+
+def seed_user(tasks: List[Dict], username: str = 'bench') -> int:
+    """Insert a user, their analytics and the generated tasks; return the user id
+
+    Needs an app context with the schema created.
+    """
+    from app import db
+    from models.user import User
+    from models.task import Task
+    from models.analytics import UserAnalytics
+
+    user = User(username=username, email=f'{username}@example.com')
+    # Skip bcrypt: benchmark clients log in through the session directly
+    user._password_hash = '!'
+    db.session.add(user)
+    db.session.flush()
+
+    analytics = UserAnalytics(
+        user_id=user.id, total_tasks_created=len(tasks), total_tasks_completed=0,
+        total_productive_time=0, current_streak=0, longest_streak=0
+    )
+    completed = [SimpleNamespace(**task) for task in tasks if task['status'] == 'completed']
+    analytics.update_bulk_completion_metrics(completed)
+    db.session.add(analytics)
+
+    columns = ('title', 'description', 'status', 'priority', 'due_date', 'created_at',
+               'updated_at', 'completed_at', 'category', 'complexity_score',
+               'sentiment_score', 'estimated_duration', 'actual_duration')
+    rows = []
+    for task in tasks:
+        row = {column: task[column] for column in columns}
+        row['keywords'] = json.dumps(task['keywords'])
+        row['tags'] = json.dumps(task['tags'])
+        row['user_id'] = user.id
+        rows.append(row)
+
+    for start in range(0, len(rows), 10000):
+        db.session.execute(Task.__table__.insert(), rows[start:start + 10000])
+
+    db.session.commit()
+    return user.id
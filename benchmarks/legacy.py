@@ -0,0 +1,47 @@
+"""Earlier implementations kept to benchmark and cross-check their replacements"""
+from typing import Dict, List
+import pandas as pd
+
+def analyze_task_patterns(historical_data: List[Dict]) -> Dict:
+    """MLEngine.analyze_task_patterns before it was vectorized"""
+    if len(historical_data) == 0:
+        return {}
+    
+    df = pd.DataFrame(historical_data)
+    
+    patterns = {
+        'completion_by_category': {},
+        'completion_by_time': {},
+        'average_duration_by_category': {},
+        'success_rate_by_category': {},
+        'common_dependencies': {}
+    }
+    
+    # Analyze completion by category
+    if 'category' in df.columns and 'status' in df.columns:
+        category_completion = df.groupby('category')['status'].apply(
+            lambda x: (x == 'completed').mean()
+        ).to_dict()
+        patterns['completion_by_category'] = category_completion
+    
+    # Analyze completion by time of day
+    if 'completed_at' in df.columns:
+        df['hour'] = pd.to_datetime(df['completed_at']).dt.hour
+        time_completion = df.groupby('hour')['status'].apply(
+            lambda x: (x == 'completed').mean()
+        ).to_dict()
+        patterns['completion_by_time'] = time_completion
+    
+    # Analyze average duration by category
+    if 'category' in df.columns and 'actual_duration' in df.columns:
+        duration_by_category = df.groupby('category')['actual_duration'].mean().to_dict()
+        patterns['average_duration_by_category'] = duration_by_category
+    
+    # Calculate success rate by category
+    if 'category' in df.columns and 'status' in df.columns:
+        success_rate = df.groupby('category').apply(
+            lambda x: (x['status'] == 'completed').mean()
+        ).to_dict()
+        patterns['success_rate_by_category'] = success_rate
+    
+    return patterns
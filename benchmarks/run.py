@@ -0,0 +1,354 @@
+"""Time the NLP, ML, analytics, visualization and endpoint hot paths
+
+    python -m benchmarks.run --sizes 100,10000 --save benchmarks/results/current.json
+    python -m benchmarks.run --compare benchmarks/results/baseline.json --threshold 0.2
+
+Each benchmark runs at every requested size (tasks per user) unless the
+size exceeds its cap; the per-call and quadratic paths are capped so a full
+run finishes in minutes. With --compare the run exits non-zero when a median
+is slower than the baseline by more than the threshold.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import generators, legacy
+
+class Benchmark(NamedTuple):
+    group: str
+    name: str
+    setup: Callable[['Context', int], Callable[[], Any]]
+    max_size: Optional[int] = None
+
+class Context:
+    """Shared, lazily built state: the app, services and generated data"""
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self._tasks = {}
+        self._users = {}
+        self._app = None
+        self._nlp_processor = None
+        self._ml_engine = None
+        self._data_visualizer = None
+
+    @property
+    def app(self):
+        if self._app is None:
+            workdir = tempfile.mkdtemp(prefix='opal-bench-')
+            os.environ.setdefault('SECRET_KEY', 'benchmark')
+            os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+            os.environ['AUTO_CREATE_TABLES'] = 'true'
+
+            from app import create_app
+            self._app = create_app()
+            self._app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+        return self._app
+
+    def tasks(self, size: int) -> List[Dict]:
+        if size not in self._tasks:
+            self._tasks[size] = generators.generate_tasks(size, seed=self.seed)
+        return self._tasks[size]
+
+    def user_id(self, size: int) -> int:
+        if size not in self._users:
+            with self.app.app_context():
+                self._users[size] = generators.seed_user(self.tasks(size), username=f'bench{size}')
+        return self._users[size]
+
+    @property
+    def nlp_processor(self):
+        if self._nlp_processor is None:
+            from utils.nlp_processor import NLPProcessor
+            self._nlp_processor = NLPProcessor()
+        return self._nlp_processor
+
+    @property
+    def ml_engine(self):
+        if self._ml_engine is None:
+            from utils.ml_engine import MLEngine
+            # Train throwaway models so predictions run against fitted estimators
+            self._ml_engine = MLEngine(model_path=tempfile.mkdtemp(prefix='opal-bench-models-'))
+            history = generators.generate_tasks(2000, seed=self.seed + 1)
+            self._ml_engine.train_duration_model(history)
+            self._ml_engine.train_priority_model(history)
+        return self._ml_engine
+
+    @property
+    def data_visualizer(self):
+        if self._data_visualizer is None:
+            from utils.data_visualizer import DataVisualizer
+            self._data_visualizer = DataVisualizer()
+        return self._data_visualizer
+
+    def task_frame(self, size: int):
+        from utils.task_frame import FRAME_FIELDS, TaskFrame
+        rows = [tuple(task.get(field) for field in FRAME_FIELDS) for task in self.tasks(size)]
+        return TaskFrame.from_rows(rows)
+
+    def analytics(self, size: int) -> Dict:
+        with self.app.app_context():
+            return generators.build_analytics(self.tasks(size))
+
+def _pending(tasks: List[Dict]) -> List[Dict]:
+    return [task for task in tasks if task['status'] == 'pending']
+
+def _nlp_process_task_input(ctx, size):
+    descriptions = generators.generate_descriptions(size, seed=ctx.seed)
+    nlp = ctx.nlp_processor
+    return lambda: [nlp.process_task_input(text) for text in descriptions]
+
+def _ml_predict_priority(ctx, size):
+    tasks = ctx.tasks(size)
+    engine = ctx.ml_engine
+    return lambda: [engine.predict_priority(task) for task in tasks]
+
+def _ml_suggest_optimal_schedule(ctx, size):
+    tasks = _pending(ctx.tasks(size))
+    engine = ctx.ml_engine
+    return lambda: engine.suggest_optimal_schedule(tasks)
+
+def _ml_detect_task_conflicts(ctx, size):
+    tasks = _pending(ctx.tasks(size))
+    engine = ctx.ml_engine
+    return lambda: engine.detect_task_conflicts(tasks)
+
+def _same_patterns(left: Dict, right: Dict) -> bool:
+    """Equal tables, with keys of the same type in the same order, treating NaN as equal to NaN"""
+    if list(left) != list(right):
+        return False
+    for name in left:
+        # 1 == 1.0, so compare key types explicitly
+        if [(type(key), key) for key in left[name]] != [(type(key), key) for key in right[name]]:
+            return False
+        for key, value in left[name].items():
+            other = right[name][key]
+            if value != other and not (value != value and other != other):
+                return False
+    return True
+
+def _check_patterns(engine, data, tasks: List[Dict], label: str):
+    if not _same_patterns(engine.analyze_task_patterns(data), legacy.analyze_task_patterns(tasks)):
+        raise RuntimeError(f'analyze_task_patterns on {label} differs from the legacy implementation')
+
+def _check_merged_frame_patterns(ctx, size):
+    """Compare a frame that an edit emptied a category of with the edited tasks
+
+    TaskFrame.merge keeps the emptied category in its category list, which
+    analyze_task_patterns must not report.
+    """
+    from utils.task_frame import FRAME_FIELDS, TaskFrame
+
+    tasks = ctx.tasks(size)
+    categories = sorted({task['category'] for task in tasks if task.get('category')})
+    if len(categories) < 2:
+        return
+    moved, target = categories[0], categories[1]
+    changed = [dict(task, category=target) for task in tasks if task.get('category') == moved]
+    edited = [dict(task, category=target) if task.get('category') == moved else task for task in tasks]
+
+    merged = ctx.task_frame(size).merge(
+        TaskFrame.from_rows([tuple(task.get(field) for field in FRAME_FIELDS) for task in changed])
+    )
+    _check_patterns(ctx.ml_engine, merged, edited, 'a merged frame')
+
+def _ml_analyze_task_patterns(source):
+    def setup(ctx, size):
+        tasks = ctx.tasks(size)
+        data = ctx.task_frame(size) if source == 'frame' else tasks
+        engine = ctx.ml_engine
+        _check_patterns(engine, data, tasks, source)
+        if source == 'frame':
+            _check_merged_frame_patterns(ctx, size)
+        return lambda: engine.analyze_task_patterns(data)
+    return setup
+
+def _legacy_analyze_task_patterns(ctx, size):
+    tasks = ctx.tasks(size)
+    return lambda: legacy.analyze_task_patterns(tasks)
+
+def _analytics_completion_fold(ctx, size):
+    tasks = ctx.tasks(size)
+    app = ctx.app
+
+    def run():
+        with app.app_context():
+            generators.build_analytics(tasks)
+    return run
+
+# Members the workspace rollup benchmark spreads the generated tasks over
+WORKSPACE_MEMBERS = 500
+
+def _analytics_workspace_rollup(ctx, size):
+    tasks = ctx.tasks(size)
+    with ctx.app.app_context():
+        from utils.workspace_analytics import merge_member_analytics
+        members = [
+            generators.fold_analytics(tasks[index::WORKSPACE_MEMBERS]) for index in range(WORKSPACE_MEMBERS)
+        ]
+    return lambda: merge_member_analytics(members)
+
+def _visualizer(method, uses_tasks=False):
+    def setup(ctx, size):
+        visualizer = ctx.data_visualizer
+        argument = ctx.tasks(size) if uses_tasks else ctx.analytics(size)
+        return lambda: getattr(visualizer, method)(argument)
+    return setup
+
+def _endpoint(path):
+    def setup(ctx, size):
+        from app import figure_cache
+
+        user_id = ctx.user_id(size)
+        client = ctx.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+
+        def run():
+            # Measure the work, not a figure cache hit
+            figure_cache.clear()
+            response = client.get(path)
+            response.get_data()
+            if response.status_code != 200:
+                raise RuntimeError(f'GET {path} returned {response.status_code}')
+        return run
+    return setup
+
+BENCHMARKS = [
+    Benchmark('nlp', 'nlp.process_task_input', _nlp_process_task_input, max_size=1000),
+    Benchmark('ml', 'ml.predict_priority', _ml_predict_priority, max_size=1000),
+    Benchmark('ml', 'ml.suggest_optimal_schedule', _ml_suggest_optimal_schedule, max_size=1000),
+    Benchmark('ml', 'ml.detect_task_conflicts', _ml_detect_task_conflicts, max_size=1000),
+    Benchmark('ml', 'ml.analyze_task_patterns', _ml_analyze_task_patterns('dicts')),
+    Benchmark('ml', 'ml.analyze_task_patterns_frame', _ml_analyze_task_patterns('frame')),
+    Benchmark('ml', 'ml.analyze_task_patterns_legacy', _legacy_analyze_task_patterns),
+    Benchmark('analytics', 'analytics.update_bulk_completion_metrics', _analytics_completion_fold),
+    Benchmark('analytics', 'analytics.merge_workspace_members', _analytics_workspace_rollup),
+    Benchmark('visualizer', 'visualizer.create_productivity_dashboard',
+              _visualizer('create_productivity_dashboard')),
+    Benchmark('visualizer', 'visualizer.create_task_timeline',
+              _visualizer('create_task_timeline', uses_tasks=True)),
+    Benchmark('visualizer', 'visualizer.create_productivity_heatmap',
+              _visualizer('create_productivity_heatmap')),
+    Benchmark('visualizer', 'visualizer.create_performance_metrics',
+              _visualizer('create_performance_metrics')),
+    Benchmark('visualizer', 'visualizer.create_task_analysis_report',
+              _visualizer('create_task_analysis_report', uses_tasks=True)),
+    Benchmark('endpoints', 'endpoint.api_tasks', _endpoint('/api/tasks')),
+    Benchmark('endpoints', 'endpoint.dashboard_data', _endpoint('/analytics/dashboard?format=data')),
+    Benchmark('endpoints', 'endpoint.task_analysis_data', _endpoint('/analytics/task-analysis?format=data')),
+    Benchmark('endpoints', 'endpoint.timeline_data',
+              _endpoint('/analytics/productivity-timeline?format=data')),
+    Benchmark('endpoints', 'endpoint.heatmap_data', _endpoint('/analytics/productivity-heatmap?format=data')),
+    Benchmark('endpoints', 'endpoint.completion_trends', _endpoint('/analytics/completion-trends')),
+    Benchmark('endpoints', 'endpoint.category_performance', _endpoint('/analytics/category-performance')),
+    Benchmark('endpoints', 'endpoint.export_ndjson', _endpoint('/analytics/export-data?format=ndjson')),
+]
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run once to warm up, then time ``repeat`` calls"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'rounds': repeat
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes: List[int], groups: Optional[List[str]], repeat: int, seed: int) -> Dict:
+    ctx = Context(seed)
+    results = {}
+
+    for benchmark in BENCHMARKS:
+        if groups and benchmark.group not in groups:
+            continue
+        for size in sizes:
+            if benchmark.max_size and size > benchmark.max_size:
+                print(f'{benchmark.name:<45} {size:>8}  skipped (cap {benchmark.max_size})')
+                continue
+            result = measure(benchmark.setup(ctx, size), repeat)
+            results.setdefault(benchmark.name, {})[str(size)] = result
+            print(f"{benchmark.name:<45} {size:>8}  {result['median_s'] * 1000:>10.2f} ms")
+
+    return {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print median ratios against a baseline and return the regressions"""
+    regressions = []
+    for name, by_size in current['results'].items():
+        for size, result in by_size.items():
+            previous = baseline['results'].get(name, {}).get(size)
+            if not previous:
+                continue
+            ratio = result['median_s'] / previous['median_s'] if previous['median_s'] else 1.0
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  REGRESSION'
+                regressions.append(f'{name} @ {size}')
+            print(f'{name:<45} {size:>8}  {ratio:>6.2f}x{flag}')
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10000,100000', help='Comma separated tasks per user.')
+    parser.add_argument('--groups', help='Comma separated subset of: nlp, ml, analytics, visualizer, endpoints.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark and size.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data.')
+    parser.add_argument('--save', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Baseline JSON file to compare the results against.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown over the baseline median before failing (0.2 = 20%%).')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    groups = args.groups.split(',') if args.groups else None
+    current = run(sizes, groups, args.repeat, args.seed)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as handle:
+            json.dump(current, handle, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        print(f"\nCompared with {args.compare} ({baseline['meta'].get('commit')})")
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) above {args.threshold:.0%}: ' + ', '.join(regressions))
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""add task user updated_at index
+
+Revision ID: 7b2e91d4c058
+Revises: f0a3d85c6e21
+Create Date: 2026-10-19 13:41:52.617304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e91d4c058'
+down_revision = 'f0a3d85c6e21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the task store's COUNT/MAX(updated_at) check and changed-row reads
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_updated_at', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_updated_at')
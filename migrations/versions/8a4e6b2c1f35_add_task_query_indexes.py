@@ -0,0 +1,42 @@
+"""add task query indexes
+
+Revision ID: 8a4e6b2c1f35
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-19 09:31:07.554820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6b2c1f35'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_status_due', ['user_id', 'status', 'due_date'], unique=False)
+        batch_op.create_index('ix_tasks_user_due_id', ['user_id', 'due_date', 'id'], unique=False)
+        batch_op.create_index('ix_tasks_user_completed_at', ['user_id', 'completed_at'], unique=False)
+        batch_op.create_index('ix_tasks_user_category', ['user_id', 'category'], unique=False)
+        batch_op.create_index('ix_tasks_user_priority', ['user_id', 'priority'], unique=False)
+        batch_op.create_index('ix_tasks_parent_id', ['parent_id'], unique=False)
+
+    with op.batch_alter_table('task_dependencies', schema=None) as batch_op:
+        batch_op.create_index('ix_task_dependencies_dependent_task_id', ['dependent_task_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_dependencies', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_dependencies_dependent_task_id')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_parent_id')
+        batch_op.drop_index('ix_tasks_user_priority')
+        batch_op.drop_index('ix_tasks_user_category')
+        batch_op.drop_index('ix_tasks_user_completed_at')
+        batch_op.drop_index('ix_tasks_user_due_id')
+        batch_op.drop_index('ix_tasks_user_status_due')
@@ -0,0 +1,112 @@
+"""add task local completion slot
+
+Revision ID: 9d4c17e3b2a6
+Revises: 7b2e91d4c058
+Create Date: 2026-10-19 14:27:36.904415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from array import array
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import json
+import sys
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4c17e3b2a6'
+down_revision = '7b2e91d4c058'
+branch_labels = None
+depends_on = None
+
+
+def _zone(name):
+    """Same fallback as User.zone: UTC for unset or unknown names"""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.utc
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_local_hour', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('completed_local_weekday', sa.SmallInteger(), nullable=True))
+        batch_op.create_index('ix_tasks_user_local_slot',
+                              ['user_id', 'completed_local_weekday', 'completed_local_hour'], unique=False)
+
+    bind = op.get_bind()
+
+    # Users without a timezone keep their UTC slots, set in one statement;
+    # Monday is weekday 0
+    if bind.dialect.name == 'postgresql':
+        weekday = "CAST(EXTRACT(ISODOW FROM completed_at) AS INTEGER) - 1"
+        hour = "CAST(EXTRACT(HOUR FROM completed_at) AS INTEGER)"
+    else:
+        weekday = "(CAST(strftime('%w', completed_at) AS INTEGER) + 6) % 7"
+        hour = "CAST(strftime('%H', completed_at) AS INTEGER)"
+    bind.execute(sa.text(
+        f"UPDATE tasks SET completed_local_weekday = {weekday}, completed_local_hour = {hour} "
+        "WHERE completed_at IS NOT NULL"
+    ))
+
+    # Convert the completions of users with a timezone in Python, where
+    # unknown zone names fall back to UTC instead of failing the migration
+    users = bind.execute(sa.text("SELECT id, timezone FROM users WHERE timezone IS NOT NULL AND timezone != ''"))
+    for user_id, name in users.fetchall():
+        zone = _zone(name)
+        if zone is timezone.utc:
+            continue
+        completions = bind.execute(
+            sa.text("SELECT id, completed_at FROM tasks WHERE user_id = :user_id AND completed_at IS NOT NULL"),
+            {'user_id': user_id}
+        ).fetchall()
+        updates = []
+        for task_id, completed_at in completions:
+            if isinstance(completed_at, str):
+                # SQLite returns raw text for untyped SELECTs
+                completed_at = datetime.fromisoformat(completed_at)
+            local = completed_at.replace(tzinfo=timezone.utc).astimezone(zone)
+            updates.append({'id': task_id, 'hour': local.hour, 'weekday': local.weekday()})
+        if updates:
+            bind.execute(
+                sa.text("UPDATE tasks SET completed_local_hour = :hour, completed_local_weekday = :weekday "
+                        "WHERE id = :id"),
+                updates
+            )
+
+    # Rebuild the completion matrices in local time from the new columns
+    slots = bind.execute(sa.text(
+        "SELECT user_id, completed_local_weekday, completed_local_hour, COUNT(*) FROM tasks "
+        "WHERE completed_local_hour IS NOT NULL GROUP BY 1, 2, 3"
+    ))
+    matrices = {}
+    for user_id, weekday, hour, count in slots:
+        matrix = matrices.setdefault(user_id, array('I', [0] * 168))
+        matrix[weekday * 24 + hour] += count
+
+    for user_id, matrix in matrices.items():
+        hours = {str(hour): sum(matrix[day * 24 + hour] for day in range(7)) for hour in range(24)}
+        if sys.byteorder == 'big':
+            matrix.byteswap()
+        bind.execute(
+            sa.text(
+                "UPDATE user_analytics SET productivity_matrix = :matrix, "
+                "most_productive_hours = :hours WHERE user_id = :user_id"
+            ),
+            {
+                'matrix': matrix.tobytes(),
+                'hours': json.dumps({hour: count for hour, count in hours.items() if count}),
+                'user_id': user_id
+            }
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_local_slot')
+        batch_op.drop_column('completed_local_weekday')
+        batch_op.drop_column('completed_local_hour')
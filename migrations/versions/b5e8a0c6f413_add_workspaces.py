@@ -0,0 +1,55 @@
+"""add workspaces
+
+Revision ID: b5e8a0c6f413
+Revises: 9d4c17e3b2a6
+Create Date: 2026-10-19 16:03:12.518907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8a0c6f413'
+down_revision = '9d4c17e3b2a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('workspaces',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('workspaces', schema=None) as batch_op:
+        batch_op.create_index('ix_workspaces_owner_id', ['owner_id'], unique=False)
+
+    op.create_table('workspace_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('invited_at', sa.DateTime(), nullable=True),
+    sa.Column('joined_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('workspace_id', 'user_id', name='unique_workspace_member')
+    )
+    with op.batch_alter_table('workspace_members', schema=None) as batch_op:
+        batch_op.create_index('ix_workspace_members_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('workspace_members', schema=None) as batch_op:
+        batch_op.drop_index('ix_workspace_members_user_id')
+    op.drop_table('workspace_members')
+
+    with op.batch_alter_table('workspaces', schema=None) as batch_op:
+        batch_op.drop_index('ix_workspaces_owner_id')
+    op.drop_table('workspaces')
@@ -0,0 +1,66 @@
+"""add productivity matrix
+
+Revision ID: c52d7e1a9f04
+Revises: 8a4e6b2c1f35
+Create Date: 2026-10-19 10:02:51.318906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from array import array
+import json
+import sys
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52d7e1a9f04'
+down_revision = '8a4e6b2c1f35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_analytics', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('productivity_matrix', sa.LargeBinary(), nullable=True))
+
+    # Backfill from existing completions, grouped by (weekday, hour) in SQL
+    # with Monday as weekday 0
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        slots = sa.text(
+            "SELECT user_id, CAST(EXTRACT(ISODOW FROM completed_at) AS INTEGER) - 1, "
+            "CAST(EXTRACT(HOUR FROM completed_at) AS INTEGER), COUNT(*) "
+            "FROM tasks WHERE completed_at IS NOT NULL GROUP BY 1, 2, 3"
+        )
+    else:
+        slots = sa.text(
+            "SELECT user_id, (CAST(strftime('%w', completed_at) AS INTEGER) + 6) % 7, "
+            "CAST(strftime('%H', completed_at) AS INTEGER), COUNT(*) "
+            "FROM tasks WHERE completed_at IS NOT NULL GROUP BY 1, 2, 3"
+        )
+
+    matrices = {}
+    for user_id, weekday, hour, count in bind.execute(slots):
+        matrix = matrices.setdefault(user_id, array('I', [0] * 168))
+        matrix[weekday * 24 + hour] += count
+
+    for user_id, matrix in matrices.items():
+        hours = {str(hour): sum(matrix[day * 24 + hour] for day in range(7)) for hour in range(24)}
+        if sys.byteorder == 'big':
+            matrix.byteswap()
+        bind.execute(
+            sa.text(
+                "UPDATE user_analytics SET productivity_matrix = :matrix, "
+                "most_productive_hours = :hours WHERE user_id = :user_id"
+            ),
+            {
+                'matrix': matrix.tobytes(),
+                'hours': json.dumps({hour: count for hour, count in hours.items() if count}),
+                'user_id': user_id
+            }
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('user_analytics', schema=None) as batch_op:
+        batch_op.drop_column('productivity_matrix')
@@ -0,0 +1,30 @@
+"""add task enrichment state
+
+Revision ID: e4b19c7a2d63
+Revises: c52d7e1a9f04
+Create Date: 2026-10-19 11:24:07.552190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b19c7a2d63'
+down_revision = 'c52d7e1a9f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing tasks were enriched synchronously when they were created
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('enrichment_state', sa.String(length=20), nullable=True,
+                                      server_default='done'))
+        batch_op.create_index('ix_tasks_enrichment_state_id', ['enrichment_state', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_enrichment_state_id')
+        batch_op.drop_column('enrichment_state')
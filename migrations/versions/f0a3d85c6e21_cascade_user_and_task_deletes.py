@@ -0,0 +1,45 @@
+"""cascade user and task deletes
+
+Revision ID: f0a3d85c6e21
+Revises: e4b19c7a2d63
+Create Date: 2026-10-19 12:03:18.240957
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0a3d85c6e21'
+down_revision = 'e4b19c7a2d63'
+branch_labels = None
+depends_on = None
+
+# The initial schema left foreign keys unnamed. This convention matches the
+# names PostgreSQL generated for them and lets batch mode find them on SQLite.
+naming_convention = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+# (table, [(column, referred table, ON DELETE action)])
+FOREIGN_KEYS = [
+    ('tasks', [('user_id', 'users', 'CASCADE'), ('parent_id', 'tasks', 'SET NULL')]),
+    ('user_analytics', [('user_id', 'users', 'CASCADE')]),
+    ('task_dependencies', [('task_id', 'tasks', 'CASCADE'), ('dependent_task_id', 'tasks', 'CASCADE')]),
+]
+
+
+def _replace_foreign_keys(with_actions):
+    for table, columns in FOREIGN_KEYS:
+        with op.batch_alter_table(table, schema=None, naming_convention=naming_convention) as batch_op:
+            for column, referred, action in columns:
+                name = f'{table}_{column}_fkey'
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'],
+                                            ondelete=action if with_actions else None)
+
+
+def upgrade():
+    _replace_foreign_keys(with_actions=True)
+
+
+def downgrade():
+    _replace_foreign_keys(with_actions=False)
@@ -1,13 +1,16 @@
 from app import db
 from datetime import datetime, timedelta
+from collections import Counter
+from array import array
 import json
+import sys
 from sqlalchemy.ext.hybrid import hybrid_property
 
 class UserAnalytics(db.Model):
     __tablename__ = 'user_analytics'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
     
     # Productivity metrics
     total_tasks_completed = db.Column(db.Integer, default=0)
@@ -19,6 +22,9 @@ class UserAnalytics(db.Model):
     total_productive_time = db.Column(db.Integer, default=0)  # in minutes
     average_daily_productive_time = db.Column(db.Float)  # in minutes
     most_productive_hours = db.Column(db.JSON)
+    # Completions per local (weekday, hour) slot: 168 little-endian uint32 counters,
+    # Monday 00:00 first
+    productivity_matrix = db.Column(db.LargeBinary)
     
     # Task patterns
     common_categories = db.Column(db.JSON)
@@ -39,16 +45,59 @@ class UserAnalytics(db.Model):
     
     def update_completion_metrics(self, task):
         """Update metrics when a task is completed"""
-        self.total_tasks_completed += 1
+        self.update_bulk_completion_metrics([task])
+    
+    def update_bulk_completion_metrics(self, tasks, completed_at=None):
+        """Fold a batch of completed tasks into the metrics in one pass
+        
+        ``tasks`` may be Task instances or row tuples exposing ``category``,
+        ``tags``, ``complexity_score`` and ``actual_duration``. The completion
+        matrix slot comes from a task's ``completed_local_weekday`` and
+        ``completed_local_hour`` when set, otherwise from its own
+        ``completed_at``, and for rows without one from the ``completed_at``
+        argument (default: now), which callers give in the user's local time.
+        Every JSON column is deserialized and serialized at most once per batch.
+        """
+        completed_count = 0
+        durations = []
+        category_counts = Counter()
+        tag_counts = Counter()
+        complexity_counts = Counter()
+        matrix = self.get_productivity_matrix()
+        default_completed_at = completed_at or datetime.utcnow()
+        
+        for task in tasks:
+            completed_count += 1
+            weekday = getattr(task, 'completed_local_weekday', None)
+            hour = getattr(task, 'completed_local_hour', None)
+            if weekday is None or hour is None:
+                finished = getattr(task, 'completed_at', None) or default_completed_at
+                weekday, hour = finished.weekday(), finished.hour
+            matrix[weekday * 24 + hour] += 1
+            if task.actual_duration:
+                durations.append(task.actual_duration)
+            if task.category:
+                category_counts[task.category] += 1
+            if task.tags:
+                tag_counts.update(json.loads(task.tags) if isinstance(task.tags, str) else task.tags)
+            if task.complexity_score:
+                # Round complexity score to nearest 0.5
+                complexity_counts[str(round(task.complexity_score * 2) / 2)] += 1
+        
+        if not completed_count:
+            return
+        
+        previous_completed = self.total_tasks_completed or 0
+        self.total_tasks_completed = previous_completed + completed_count
         
         # Update completion time
-        if task.actual_duration:
+        if durations:
             if self.average_completion_time is None:
-                self.average_completion_time = task.actual_duration
+                self.average_completion_time = sum(durations) / len(durations)
             else:
                 self.average_completion_time = (
-                    (self.average_completion_time * (self.total_tasks_completed - 1) +
-                     task.actual_duration) / self.total_tasks_completed
+                    (self.average_completion_time * previous_completed + sum(durations)) /
+                    (previous_completed + len(durations))
                 )
         
         # Update completion rate
@@ -56,21 +105,23 @@ class UserAnalytics(db.Model):
                               if self.total_tasks_created > 0 else 0)
         
         # Update productive time
-        if task.actual_duration:
-            self.total_productive_time += task.actual_duration
+        self.total_productive_time = (self.total_productive_time or 0) + sum(durations)
         
         # Update streaks
         self._update_streak()
         
-        # Update category and tag statistics
-        self._update_category_stats(task.category)
-        if task.tags:
-            for tag in json.loads(task.tags) if isinstance(task.tags, str) else task.tags:
-                self._update_tag_stats(tag)
-        
-        # Update complexity distribution
-        if task.complexity_score:
-            self._update_complexity_distribution(task.complexity_score)
+        # Update the weekday-by-hour completion matrix and its hourly totals
+        self._set_productivity_matrix(matrix)
+        
+        # Update category, tag and complexity statistics
+        if category_counts:
+            self.common_categories = self._merge_counts(self.common_categories, category_counts)
+        if tag_counts:
+            self.common_tags = self._merge_counts(self.common_tags, tag_counts)
+        if complexity_counts:
+            self.task_complexity_distribution = self._merge_counts(
+                self.task_complexity_distribution, complexity_counts
+            )
     
     def _update_streak(self):
         """Update user's activity streak"""
@@ -88,30 +139,37 @@ class UserAnalytics(db.Model):
         self.last_activity_date = datetime.utcnow()
         self.longest_streak = max(self.longest_streak, self.current_streak)
     
-    def _update_category_stats(self, category):
-        """Update statistics for task categories"""
-        if not category:
-            return
-        
-        categories = json.loads(self.common_categories) if isinstance(self.common_categories, str) else self.common_categories
-        categories[category] = categories.get(category, 0) + 1
-        self.common_categories = json.dumps(categories)
+    def get_productivity_matrix(self):
+        """Return the 168 weekday-by-hour completion counters as an array"""
+        matrix = array('I')
+        if self.productivity_matrix:
+            matrix.frombytes(self.productivity_matrix)
+            if sys.byteorder == 'big':
+                matrix.byteswap()
+        else:
+            matrix.extend([0] * 168)
+        return matrix
     
-    def _update_tag_stats(self, tag):
-        """Update statistics for task tags"""
-        tags = json.loads(self.common_tags) if isinstance(self.common_tags, str) else self.common_tags
-        tags[tag] = tags.get(tag, 0) + 1
-        self.common_tags = json.dumps(tags)
+    def _set_productivity_matrix(self, matrix):
+        """Store the completion matrix and derive the per-hour totals from it"""
+        hours = {
+            str(hour): sum(matrix[day * 24 + hour] for day in range(7))
+            for hour in range(24)
+        }
+        self.most_productive_hours = json.dumps({hour: count for hour, count in hours.items() if count})
+        
+        if sys.byteorder == 'big':
+            matrix = array('I', matrix)
+            matrix.byteswap()
+        self.productivity_matrix = matrix.tobytes()
     
-    def _update_complexity_distribution(self, complexity_score):
-        """Update distribution of task complexity scores"""
-        distribution = json.loads(self.task_complexity_distribution) if isinstance(self.task_complexity_distribution, str) else self.task_complexity_distribution
-        
-        # Round complexity score to nearest 0.5
-        rounded_score = round(complexity_score * 2) / 2
-        distribution[str(rounded_score)] = distribution.get(str(rounded_score), 0) + 1
-        
-        self.task_complexity_distribution = json.dumps(distribution)
+    @staticmethod
+    def _merge_counts(stored, counts):
+        """Add ``counts`` to a stored JSON histogram and reserialize it once"""
+        histogram = json.loads(stored) if isinstance(stored, str) else dict(stored or {})
+        for key, count in counts.items():
+            histogram[key] = histogram.get(key, 0) + count
+        return json.dumps(histogram)
     
     def calculate_productivity_score(self):
         """Calculate overall productivity score (0-100)"""
@@ -159,6 +217,17 @@ class UserAnalytics(db.Model):
         
         return round(final_score, 2)
     
+    def get_counters(self):
+        """Headline counters pushed to clients when they change"""
+        return {
+            'total_tasks_created': self.total_tasks_created,
+            'total_tasks_completed': self.total_tasks_completed,
+            'completion_rate': self.completion_rate,
+            'average_completion_time': self.average_completion_time,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak
+        }
+    
     def to_dict(self):
         """Convert analytics to dictionary for API responses"""
         return {
@@ -172,6 +241,7 @@ class UserAnalytics(db.Model):
             'longest_streak': self.longest_streak,
             'productivity_score': self.calculate_productivity_score(),
             'most_productive_hours': json.loads(self.most_productive_hours) if isinstance(self.most_productive_hours, str) else self.most_productive_hours,
+            'productivity_matrix': self.get_productivity_matrix().tolist(),
             'common_categories': json.loads(self.common_categories) if isinstance(self.common_categories, str) else self.common_categories,
             'common_tags': json.loads(self.common_tags) if isinstance(self.common_tags, str) else self.common_tags,
             'task_complexity_distribution': json.loads(self.task_complexity_distribution) if isinstance(self.task_complexity_distribution, str) else self.task_complexity_distribution
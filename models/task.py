@@ -14,6 +14,10 @@ class Task(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     due_date = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
+    # Local hour (0-23) and weekday (Monday is 0) of completion in the owner's
+    # timezone, fixed at write time so reads never convert timestamps
+    completed_local_hour = db.Column(db.SmallInteger)
+    completed_local_weekday = db.Column(db.SmallInteger)
     
     # Task metadata
     status = db.Column(db.String(20), default='pending')  # pending, in_progress, completed, archived
@@ -26,23 +30,40 @@ class Task(db.Model):
     complexity_score = db.Column(db.Float)
     sentiment_score = db.Column(db.Float)
     keywords = db.Column(db.JSON)
+    enrichment_state = db.Column(db.String(20), default='done')  # pending, done, failed
     
     # Relationships
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    parent_id = db.Column(db.Integer, db.ForeignKey('tasks.id'))
-    subtasks = relationship('Task', backref=db.backref('parent', remote_side=[id]))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    parent_id = db.Column(db.Integer, db.ForeignKey('tasks.id', ondelete='SET NULL'))
+    subtasks = relationship('Task', backref=db.backref('parent', remote_side=[id]), passive_deletes=True)
     
     # Dependencies
     dependencies = db.relationship(
         'TaskDependency',
         primaryjoin='Task.id==TaskDependency.task_id',
         backref='task',
-        lazy='dynamic'
+        lazy='dynamic',
+        passive_deletes=True
     )
     
     # Tags and labels
     tags = db.Column(db.JSON)
     
+    # Indexes follow the hot access paths: every query is scoped to a user and
+    # filtered by status, category, priority or completion time, and lists are
+    # ordered by (due_date, id)
+    __table_args__ = (
+        db.Index('ix_tasks_user_status_due', 'user_id', 'status', 'due_date'),
+        db.Index('ix_tasks_user_due_id', 'user_id', 'due_date', 'id'),
+        db.Index('ix_tasks_user_completed_at', 'user_id', 'completed_at'),
+        db.Index('ix_tasks_user_category', 'user_id', 'category'),
+        db.Index('ix_tasks_user_priority', 'user_id', 'priority'),
+        db.Index('ix_tasks_parent_id', 'parent_id'),
+        db.Index('ix_tasks_enrichment_state_id', 'enrichment_state', 'id'),
+        db.Index('ix_tasks_user_updated_at', 'user_id', 'updated_at'),
+        db.Index('ix_tasks_user_local_slot', 'user_id', 'completed_local_weekday', 'completed_local_hour'),
+    )
+    
     def __init__(self, **kwargs):
         super(Task, self).__init__(**kwargs)
         self.tags = json.dumps([]) if not self.tags else self.tags
@@ -55,6 +76,13 @@ class Task(db.Model):
     def is_overdue(self):
         return self.due_date and self.due_date < datetime.utcnow() and not self.is_completed
     
+    def mark_completed(self, completed_at, local_completed_at):
+        """Complete the task, recording its local completion hour and weekday"""
+        self.status = 'completed'
+        self.completed_at = completed_at
+        self.completed_local_hour = local_completed_at.hour
+        self.completed_local_weekday = local_completed_at.weekday()
+    
     def add_dependency(self, dependent_task):
         """Add a dependency to this task"""
         if dependent_task.id == self.id:
@@ -71,7 +99,7 @@ class Task(db.Model):
     
     def get_dependent_tasks(self):
         """Get all tasks that depend on this task"""
-        return Task.query.join(TaskDependency).filter(
+        return Task.query.join(TaskDependency, TaskDependency.task_id == Task.id).filter(
             TaskDependency.dependent_task_id == self.id
         ).all()
     
@@ -117,21 +145,43 @@ class Task(db.Model):
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'category': self.category,
             'complexity_score': self.complexity_score,
+            'enrichment_state': self.enrichment_state,
             'tags': json.loads(self.tags) if isinstance(self.tags, str) else self.tags,
             'estimated_duration': self.estimated_duration,
             'actual_duration': self.actual_duration,
             'is_completed': self.is_completed,
             'is_overdue': self.is_overdue
         }
+    
+    def to_summary_dict(self):
+        """Convert task to a compact dictionary for list responses
+        
+        Only touches the columns loaded for task lists, so it never triggers
+        a lazy load of the description or JSON fields.
+        """
+        return {
+            'id': self.id,
+            'title': self.title,
+            'status': self.status,
+            'priority': self.priority,
+            'category': self.category,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'estimated_duration': self.estimated_duration,
+            'is_completed': self.is_completed,
+            'is_overdue': self.is_overdue
+        }
 
 class TaskDependency(db.Model):
     __tablename__ = 'task_dependencies'
     
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
-    dependent_task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False)
+    dependent_task_id = db.Column(db.Integer, db.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # The unique constraint also serves lookups by task_id
     __table_args__ = (
         db.UniqueConstraint('task_id', 'dependent_task_id', name='unique_task_dependency'),
+        db.Index('ix_task_dependencies_dependent_task_id', 'dependent_task_id'),
     ) 
\ No newline at end of file
@@ -1,8 +1,8 @@
-from app import db, login_manager
+from app import db, login_manager, password_hasher, identity_cache
 from flask_login import UserMixin
-from datetime import datetime
-import bcrypt
+from datetime import datetime, timezone
 from sqlalchemy.ext.hybrid import hybrid_property
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -22,8 +22,10 @@ class User(UserMixin, db.Model):
     preferred_working_hours = db.Column(db.JSON)
     
     # Relationships
-    tasks = db.relationship('Task', backref='user', lazy='dynamic')
-    analytics = db.relationship('UserAnalytics', backref='user', uselist=False)
+    # Owned rows are removed by ON DELETE CASCADE or by utils.account_deletion,
+    # never loaded one by one just to be deleted
+    tasks = db.relationship('Task', backref='user', lazy='dynamic', passive_deletes=True)
+    analytics = db.relationship('UserAnalytics', backref='user', uselist=False, passive_deletes=True)
     
     @hybrid_property
     def password(self):
@@ -31,11 +33,27 @@ class User(UserMixin, db.Model):
     
     @password.setter
     def password(self, password):
-        salt = bcrypt.gensalt()
-        self._password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        self._password_hash = password_hasher.hash(password)
     
     def verify_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self._password_hash.encode('utf-8'))
+        return password_hasher.verify(password, self._password_hash)
+    
+    def needs_rehash(self):
+        return password_hasher.needs_rehash(self._password_hash)
+    
+    @property
+    def zone(self):
+        """The user's timezone, or UTC when it is unset or not a known zone name"""
+        if self.timezone:
+            try:
+                return ZoneInfo(self.timezone)
+            except (ZoneInfoNotFoundError, ValueError):
+                pass
+        return timezone.utc
+    
+    def to_local(self, value):
+        """Convert a naive UTC datetime to naive local time in the user's timezone"""
+        return value.replace(tzinfo=timezone.utc).astimezone(self.zone).replace(tzinfo=None)
     
     def update_last_login(self):
         self.last_login = datetime.utcnow()
@@ -54,6 +72,30 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+def _still_active(cached):
+    """Whether a cached user's activation matches the database; one column read"""
+    is_active = db.session.execute(
+        db.select(User.is_active).where(User.id == cached.id)
+    ).scalar()
+    return is_active is not None and is_active == cached.is_active
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id)) 
\ No newline at end of file
+    user_id = int(user_id)
+    # Other workers cannot drop this process's entry, so a deactivated or
+    # deleted account is caught by rechecking it once it is a moment old
+    cached = identity_cache.get(user_id, revalidate=_still_active)
+    
+    if cached is None:
+        cached = db.session.get(User, user_id)
+        if cached is None:
+            return None
+        # Keep a detached copy so later commits cannot expire the shared instance
+        db.session.expunge(cached)
+        identity_cache.set(user_id, cached)
+    
+    if not cached.is_active:
+        return None
+    
+    # Attach a per-request copy without another SELECT
+    return db.session.merge(cached, load=False)
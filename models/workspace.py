@@ -0,0 +1,58 @@
+from app import db
+from datetime import datetime
+
+class Workspace(db.Model):
+    __tablename__ = 'workspaces'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Members are removed by ON DELETE CASCADE or by utils.account_deletion
+    members = db.relationship('WorkspaceMember', backref='workspace', lazy='dynamic', passive_deletes=True)
+
+    __table_args__ = (
+        db.Index('ix_workspaces_owner_id', 'owner_id'),
+    )
+
+    def to_dict(self):
+        """Convert workspace to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'owner_id': self.owner_id,
+            'created_at': self.created_at.isoformat()
+        }
+
+class WorkspaceMember(db.Model):
+    __tablename__ = 'workspace_members'
+
+    id = db.Column(db.Integer, primary_key=True)
+    workspace_id = db.Column(db.Integer, db.ForeignKey('workspaces.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    role = db.Column(db.String(20), default='member')  # owner, member
+    # Members are invited and only count once they accept, so nobody's
+    # analytics join a workspace without their consent
+    status = db.Column(db.String(20), default='invited')  # invited, active
+    invited_at = db.Column(db.DateTime, default=datetime.utcnow)
+    joined_at = db.Column(db.DateTime)
+
+    # The unique constraint also serves the member lookups of a workspace;
+    # the user index finds the workspaces a user's writes invalidate
+    __table_args__ = (
+        db.UniqueConstraint('workspace_id', 'user_id', name='unique_workspace_member'),
+        db.Index('ix_workspace_members_user_id', 'user_id'),
+    )
+
+    def accept(self):
+        """Turn the invite into an active membership"""
+        self.status = 'active'
+        self.joined_at = datetime.utcnow()
+
+    @classmethod
+    def is_member(cls, workspace_id, user_id):
+        """Whether a user has accepted membership of a workspace"""
+        return db.session.query(
+            cls.query.filter_by(workspace_id=workspace_id, user_id=user_id, status='active').exists()
+        ).scalar()
@@ -0,0 +1,40 @@
+import os
+import pytest
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app on a throwaway database, or on TEST_DATABASE_URL when set"""
+    monkeypatch.setenv('SECRET_KEY', 'test')
+    monkeypatch.setenv('DATABASE_URL', os.getenv('TEST_DATABASE_URL', 'sqlite:///' + str(tmp_path / 'test.db')))
+    monkeypatch.setenv('AUTO_CREATE_TABLES', 'true')
+
+    from app import create_app, db, figure_cache, identity_cache, task_store, workspace_store
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+    # The caches are process-wide singletons shared by every app
+    for cache in (figure_cache, identity_cache, task_store, workspace_store):
+        cache.clear()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def user_id(app):
+    """A user with a few hundred generated tasks"""
+    from benchmarks import generators
+
+    with app.app_context():
+        return generators.seed_user(generators.generate_tasks(300, seed=1), username='tester')
+
+@pytest.fixture
+def client(app, user_id):
+    """A test client logged in as ``user_id``"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
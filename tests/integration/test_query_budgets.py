@@ -0,0 +1,46 @@
+import pytest
+from utils.query_counter import query_budget
+
+# Every request loads the logged-in user, then runs its own queries; the
+# budgets leave no room for a query per task. Only endpoints that render
+# without templates are listed; the HTML task list is checked below
+BUDGETS = [
+    ('/api/tasks', 2),
+    ('/api/tasks?status=pending&per_page=200', 2),
+    ('/api/tasks?status=completed&priority=2', 2),
+    ('/analytics/dashboard?format=data', 2),
+]
+
+@pytest.mark.parametrize('path, budget', BUDGETS)
+def test_endpoint_stays_within_query_budget(client, path, budget):
+    with query_budget(budget, n_plus_one_threshold=3):
+        response = client.get(path)
+    assert response.status_code == 200
+
+def test_task_list_page_loads_tasks_within_budget(client, monkeypatch):
+    import app.routes.tasks as tasks_routes
+
+    # Count the queries up to rendering, whether or not the templates ship
+    rendered = {}
+    def render_template(template, **context):
+        rendered.update(context, template=template)
+        return ''
+    monkeypatch.setattr(tasks_routes, 'render_template', render_template)
+
+    with query_budget(2, n_plus_one_threshold=3):
+        response = client.get('/tasks?per_page=200')
+        # The columns the list shows must be loaded with the page
+        for task in rendered['tasks']:
+            task.title, task.status, task.due_date
+    assert response.status_code == 200
+    assert rendered['template'] == 'tasks/list.html'
+    assert rendered['tasks']
+
+def test_later_task_pages_cost_the_same_as_the_first(client):
+    cursor = client.get('/api/tasks').get_json()['next_cursor']
+    assert cursor
+
+    with query_budget(2, n_plus_one_threshold=3):
+        response = client.get(f'/api/tasks?cursor={cursor}')
+    assert response.status_code == 200
+    assert response.get_json()['tasks']
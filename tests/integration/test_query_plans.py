@@ -0,0 +1,30 @@
+import pytest
+from utils.query_plans import FULL_INDEX_SCAN, check_hot_queries, full_scans
+
+def test_hot_queries_use_an_index(app, user_id):
+    with app.app_context():
+        report = check_hot_queries(user_id)
+
+    scans = {name: result['plan'] for name, result in report.items() if result['full_scans']}
+    assert not scans, f'Hot queries scanning a whole table or index: {scans}'
+
+@pytest.mark.parametrize('line', [
+    'SCAN tasks',
+    'SCAN tasks USING INDEX ix_tasks_user_due_id',
+    'SCAN tasks USING COVERING INDEX ix_tasks_user_category',
+    'Seq Scan on tasks',
+    'Index Scan on tasks using ix_tasks_user_due_id' + FULL_INDEX_SCAN,
+])
+def test_full_scans_flags_whole_table_and_index_reads(line):
+    assert full_scans([line]) == [line]
+
+def test_full_scans_accepts_lookups_and_intended_covering_scans():
+    plan = [
+        'SEARCH tasks USING INDEX ix_tasks_user_status_due (user_id=? AND status=?)',
+        'SEARCH tasks USING INTEGER PRIMARY KEY (rowid=?)',
+        'Index Scan on tasks using ix_tasks_user_due_id',
+        'SCAN tasks USING COVERING INDEX ix_tasks_user_category',
+        'Index Only Scan on tasks using ix_tasks_user_category' + FULL_INDEX_SCAN,
+    ]
+    assert full_scans(plan, covering=['ix_tasks_user_category']) == []
+    assert full_scans(plan) == plan[3:]
@@ -0,0 +1,90 @@
+from app import db, figure_cache, identity_cache, task_store, workspace_store
+from models.user import User
+from models.task import Task, TaskDependency
+from models.analytics import UserAnalytics
+from models.workspace import Workspace, WorkspaceMember
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def delete_user_data(user_id: int):
+    """Delete a user and everything they own with set-based statements
+
+    Rows are removed children first (dependencies, subtask links, tasks,
+    analytics, memberships and owned workspaces, the user) so the deletes
+    succeed whether or not the database enforces ON DELETE CASCADE; SQLite
+    leaves foreign keys unenforced by default. Nothing is committed here, so
+    the caller decides the transaction.
+    """
+    user_task_ids = db.select(Task.id).where(Task.user_id == user_id)
+
+    TaskDependency.query.filter(
+        db.or_(
+            TaskDependency.task_id.in_(user_task_ids),
+            TaskDependency.dependent_task_id.in_(user_task_ids)
+        )
+    ).delete(synchronize_session=False)
+
+    # Detach subtasks so tasks can be deleted in any order
+    Task.query.filter(Task.parent_id.in_(user_task_ids)).update(
+        {'parent_id': None}, synchronize_session=False
+    )
+
+    Task.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+    UserAnalytics.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+    # Workspaces the user owns go with them, along with all their members
+    owned_workspace_ids = db.select(Workspace.id).where(Workspace.owner_id == user_id)
+    WorkspaceMember.query.filter(
+        db.or_(
+            WorkspaceMember.user_id == user_id,
+            WorkspaceMember.workspace_id.in_(owned_workspace_ids)
+        )
+    ).delete(synchronize_session=False)
+    Workspace.query.filter_by(owner_id=user_id).delete(synchronize_session=False)
+    User.query.filter_by(id=user_id).delete(synchronize_session=False)
+
+def _delete_in_background(app, user_id: int):
+    with app.app_context():
+        try:
+            delete_user_data(user_id)
+            db.session.commit()
+            figure_cache.invalidate_user(user_id)
+            task_store.invalidate(user_id)
+            workspace_store.invalidate_user(user_id)
+            identity_cache.invalidate(user_id)
+            logger.info('Deleted account %s in the background', user_id)
+        except Exception:
+            db.session.rollback()
+            logger.exception('Background deletion of account %s failed', user_id)
+        finally:
+            db.session.remove()
+
+def delete_account(app, user_id: int) -> bool:
+    """Delete an account, in a background thread when it owns many tasks
+
+    Large accounts are deactivated and committed first, so the user is locked
+    out while the deletes run; other workers notice within the identity
+    cache's max age. Returns True if deletion was deferred.
+    """
+    task_count = Task.query.filter_by(user_id=user_id).count()
+
+    if task_count <= app.config['ACCOUNT_DELETE_BACKGROUND_THRESHOLD']:
+        delete_user_data(user_id)
+        db.session.commit()
+        figure_cache.invalidate_user(user_id)
+        task_store.invalidate(user_id)
+        workspace_store.invalidate_user(user_id)
+        identity_cache.invalidate(user_id)
+        return False
+
+    User.query.filter_by(id=user_id).update({'is_active': False}, synchronize_session=False)
+    db.session.commit()
+    identity_cache.invalidate(user_id)
+
+    threading.Thread(
+        target=_delete_in_background, args=(app, user_id),
+        name=f'delete-account-{user_id}', daemon=True
+    ).start()
+    return True
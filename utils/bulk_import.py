@@ -0,0 +1,137 @@
+from app import db
+from models.task import Task
+from models.analytics import UserAnalytics
+from models.user import User
+from utils.export import require_pyarrow
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+import io
+import json
+
+# Task columns accepted by the importer; ids are reassigned on insert and
+# parent links are not carried across
+IMPORT_FIELDS = (
+    'title', 'description', 'status', 'priority', 'due_date', 'created_at',
+    'updated_at', 'completed_at', 'category', 'complexity_score', 'tags',
+    'estimated_duration', 'actual_duration'
+)
+
+def _read_batches(path: str, batch_size: int) -> Iterator[List[Dict]]:
+    """Yield lists of row dicts from a Parquet, Arrow IPC or NDJSON file"""
+    if path.endswith('.ndjson') or path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as handle:
+            batch = []
+            for line in handle:
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        return
+    
+    pa = require_pyarrow()
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pylist()
+    else:
+        with pa.OSFile(path, 'rb') as source:
+            for batch in pa.ipc.open_stream(source):
+                yield batch.to_pylist()
+
+def _parse_datetime(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+def _prepare_row(record: Dict, user: User, now: datetime) -> Dict:
+    """Map an exported record onto insertable task columns"""
+    row = {field: record.get(field) for field in IMPORT_FIELDS}
+    for field in ('due_date', 'created_at', 'updated_at', 'completed_at'):
+        row[field] = _parse_datetime(row[field])
+    
+    local_completed_at = user.to_local(row['completed_at']) if row['completed_at'] else None
+    row['completed_local_hour'] = local_completed_at.hour if local_completed_at else None
+    row['completed_local_weekday'] = local_completed_at.weekday() if local_completed_at else None
+    
+    row['tags'] = json.dumps(row['tags'] or [])
+    row['status'] = row['status'] or 'pending'
+    row['priority'] = row['priority'] or 0
+    row['created_at'] = row['created_at'] or now
+    row['updated_at'] = row['updated_at'] or now
+    row['user_id'] = user.id
+    return row
+
+def _copy_value(value) -> str:
+    """Render a value in PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def _copy_rows(rows: List[Dict]):
+    """Load a batch through COPY FROM STDIN on PostgreSQL"""
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(row[column]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    # Use the session's own connection so the COPY joins its transaction
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY tasks ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+def import_tasks(path: str, user_id: int, batch_size: int = 50000) -> int:
+    """Bulk load tasks exported by /analytics/export-data for a user
+    
+    Rows are inserted batch by batch through COPY on PostgreSQL and an
+    executemany INSERT elsewhere, without building ORM objects. Imported
+    completions are folded into the user's analytics batch by batch, and the
+    whole import commits as one transaction. Returns the number of imported
+    tasks.
+    """
+    now = datetime.utcnow()
+    user = db.session.get(User, user_id)
+    if user is None:
+        raise ValueError(f'No user with id {user_id}')
+    use_copy = db.session.connection().dialect.name == 'postgresql'
+    analytics = UserAnalytics.query.filter_by(user_id=user_id).first()
+    local_now = user.to_local(now)
+    imported = 0
+    
+    for records in _read_batches(path, batch_size):
+        rows = [_prepare_row(record, user, now) for record in records]
+        if not rows:
+            continue
+        
+        if use_copy:
+            _copy_rows(rows)
+        else:
+            db.session.execute(Task.__table__.insert(), rows)
+        imported += len(rows)
+        
+        # Fold the batch's completions into the analytics like any other
+        # completion, so the matrix and histograms match the counters
+        if analytics:
+            analytics.total_tasks_created = (analytics.total_tasks_created or 0) + len(rows)
+            analytics.update_bulk_completion_metrics(
+                [SimpleNamespace(**row) for row in rows if row['status'] == 'completed'],
+                completed_at=local_now
+            )
+    
+    # Batches without completions leave the rate behind the created count
+    if analytics:
+        analytics.completion_rate = ((analytics.total_tasks_completed or 0) / analytics.total_tasks_created * 100
+                                     if analytics.total_tasks_created > 0 else 0)
+    
+    db.session.commit()
+    return imported
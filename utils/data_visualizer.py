@@ -1,42 +1,87 @@
-import plotly.graph_objects as go
-import plotly.express as px
+from __future__ import annotations
+
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import json
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Plotly's qualitative Set3 palette, also used by app/static/js/charts.js;
+# Plotly itself is only imported once a figure is drawn
+COLOR_PALETTE = [
+    'rgb(141,211,199)', 'rgb(255,255,179)', 'rgb(190,186,218)', 'rgb(251,128,114)',
+    'rgb(128,177,211)', 'rgb(253,180,98)', 'rgb(179,222,105)', 'rgb(252,205,229)',
+    'rgb(217,217,217)', 'rgb(188,128,189)', 'rgb(204,235,197)', 'rgb(255,237,111)'
+]
+
 class DataVisualizer:
+    """Build analytics charts as Plotly figures or as compact chart data
+    
+    Each ``*_data`` method reduces its inputs to the arrays a chart needs,
+    tagged with a layout ``spec`` that app/static/js/charts.js can also draw.
+    """
+    
     def __init__(self):
-        self.color_palette = px.colors.qualitative.Set3
+        self.color_palette = COLOR_PALETTE
     
     def create_productivity_dashboard(self, analytics_data: Dict) -> Dict[str, go.Figure]:
         """Create a comprehensive productivity dashboard"""
+        return {
+            name: self.build_figure(chart)
+            for name, chart in self.productivity_dashboard_data(analytics_data).items()
+        }
+    
+    def productivity_dashboard_data(self, analytics_data: Dict) -> Dict[str, Dict]:
+        """Compact chart data for the productivity dashboard"""
         dashboard = {}
         
         # Task completion rate over time
         if 'completion_rate' in analytics_data:
-            dashboard['completion_rate'] = self._create_completion_rate_chart(analytics_data)
+            dashboard['completion_rate'] = {
+                'spec': 'completion_rate',
+                'y': [analytics_data['completion_rate']]
+            }
         
         # Task distribution by category
         if 'common_categories' in analytics_data:
-            dashboard['category_distribution'] = self._create_category_distribution_chart(analytics_data)
+            categories = self._load_json(analytics_data['common_categories'])
+            dashboard['category_distribution'] = {
+                'spec': 'category_distribution',
+                'labels': list(categories.keys()),
+                'values': list(categories.values())
+            }
         
         # Productivity by time of day
         if 'most_productive_hours' in analytics_data:
-            dashboard['productivity_by_hour'] = self._create_productivity_by_hour_chart(analytics_data)
+            hours = self._load_json(analytics_data['most_productive_hours'])
+            dashboard['productivity_by_hour'] = {
+                'spec': 'productivity_by_hour',
+                'x': list(hours.keys()),
+                'y': list(hours.values())
+            }
         
         # Task complexity distribution
         if 'task_complexity_distribution' in analytics_data:
-            dashboard['complexity_distribution'] = self._create_complexity_distribution_chart(analytics_data)
+            complexity = self._load_json(analytics_data['task_complexity_distribution'])
+            dashboard['complexity_distribution'] = {
+                'spec': 'complexity_distribution',
+                'x': list(complexity.keys()),
+                'y': list(complexity.values())
+            }
         
         return dashboard
     
-    def _create_completion_rate_chart(self, analytics_data: Dict) -> go.Figure:
+    def _create_completion_rate_chart(self, chart: Dict) -> go.Figure:
         """Create a line chart showing task completion rate over time"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            y=[analytics_data['completion_rate']],
+            y=chart['y'],
             mode='lines+markers',
             name='Completion Rate',
             line=dict(color=self.color_palette[0], width=2)
@@ -51,13 +96,13 @@ class DataVisualizer:
         
         return fig
     
-    def _create_category_distribution_chart(self, analytics_data: Dict) -> go.Figure:
+    def _create_category_distribution_chart(self, chart: Dict) -> go.Figure:
         """Create a pie chart showing task distribution by category"""
-        categories = json.loads(analytics_data['common_categories']) if isinstance(analytics_data['common_categories'], str) else analytics_data['common_categories']
+        import plotly.graph_objects as go
         
         fig = go.Figure(data=[go.Pie(
-            labels=list(categories.keys()),
-            values=list(categories.values()),
+            labels=chart['labels'],
+            values=chart['values'],
             hole=.3,
             marker_colors=self.color_palette
         )])
@@ -69,13 +114,13 @@ class DataVisualizer:
         
         return fig
     
-    def _create_productivity_by_hour_chart(self, analytics_data: Dict) -> go.Figure:
+    def _create_productivity_by_hour_chart(self, chart: Dict) -> go.Figure:
         """Create a bar chart showing productivity by hour of day"""
-        hours = json.loads(analytics_data['most_productive_hours']) if isinstance(analytics_data['most_productive_hours'], str) else analytics_data['most_productive_hours']
+        import plotly.graph_objects as go
         
         fig = go.Figure(data=[go.Bar(
-            x=list(hours.keys()),
-            y=list(hours.values()),
+            x=chart['x'],
+            y=chart['y'],
             marker_color=self.color_palette[2]
         )])
         
@@ -88,13 +133,13 @@ class DataVisualizer:
         
         return fig
     
-    def _create_complexity_distribution_chart(self, analytics_data: Dict) -> go.Figure:
+    def _create_complexity_distribution_chart(self, chart: Dict) -> go.Figure:
         """Create a histogram showing task complexity distribution"""
-        complexity = json.loads(analytics_data['task_complexity_distribution']) if isinstance(analytics_data['task_complexity_distribution'], str) else analytics_data['task_complexity_distribution']
+        import plotly.graph_objects as go
         
         fig = go.Figure(data=[go.Bar(
-            x=list(complexity.keys()),
-            y=list(complexity.values()),
+            x=chart['x'],
+            y=chart['y'],
             marker_color=self.color_palette[3]
         )])
         
@@ -107,54 +152,126 @@ class DataVisualizer:
         
         return fig
     
-    def create_task_timeline(self, tasks: List[Dict]) -> go.Figure:
-        """Create a Gantt chart showing task timeline"""
+    def create_task_timeline(self, tasks: List[Dict], start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, max_tasks: int = 500) -> go.Figure:
+        """Create a Gantt chart showing task timeline
+        
+        Tasks are windowed by due date and capped at the ``max_tasks`` most
+        urgent ones, then drawn as one bar trace per category so the figure
+        size no longer grows with the number of tasks.
+        """
+        return self._create_task_timeline_chart(self.task_timeline_data(tasks, start, end, max_tasks))
+    
+    def task_timeline_data(self, tasks: List[Dict], start: Optional[datetime] = None,
+                           end: Optional[datetime] = None, max_tasks: int = 500,
+                           total: Optional[int] = None) -> Dict:
+        """Compact chart data for the task timeline, one series per category
+        
+        ``total`` is the number of tasks in the window when ``tasks`` was
+        already capped by the caller, e.g. with a SQL LIMIT.
+        """
         df = pd.DataFrame(tasks)
+        chart = {'spec': 'task_timeline', 'title': 'Task Timeline', 'series': []}
+        
+        if df.empty:
+            return chart
+        
+        total = max(total or 0, len(df))
+        df = self._window_timeline_tasks(df, start, end, max_tasks)
+        if len(df) < total:
+            chart['title'] = f'Task Timeline (showing {len(df)} of {total} tasks)'
+        
+        categories = df['category'].fillna('other')
+        for category, group in df.groupby(categories, sort=True):
+            chart['series'].append({
+                'name': category,
+                'x': group['estimated_duration'].to_numpy(dtype=float),
+                'y': group['title'].tolist(),
+                'priority': group['priority'].to_numpy()
+            })
+        
+        return chart
+    
+    def _create_task_timeline_chart(self, chart: Dict) -> go.Figure:
+        """Create a horizontal bar chart with one trace per category"""
+        import plotly.graph_objects as go
         
         fig = go.Figure()
         
-        for i, task in df.iterrows():
+        for index, series in enumerate(chart['series']):
             fig.add_trace(go.Bar(
-                x=[task['estimated_duration']],
-                y=[task['title']],
+                x=series['x'],
+                y=series['y'],
                 orientation='h',
-                name=task['category'],
-                marker_color=self.color_palette[i % len(self.color_palette)],
-                text=[f"Priority: {task['priority']}"],
+                name=series['name'],
+                marker_color=self.color_palette[index % len(self.color_palette)],
+                customdata=series['priority'],
                 hovertemplate="<b>%{y}</b><br>" +
                             "Duration: %{x} minutes<br>" +
-                            "%{text}<br>" +
+                            "Priority: %{customdata}<br>" +
                             "<extra></extra>"
             ))
         
         fig.update_layout(
-            title='Task Timeline',
+            title=chart['title'],
             xaxis_title='Duration (minutes)',
             yaxis_title='Task',
             template='plotly_white',
-            showlegend=False
+            barmode='overlay',
+            showlegend=True
         )
         
         return fig
     
+    def _window_timeline_tasks(self, df: pd.DataFrame, start: Optional[datetime],
+                               end: Optional[datetime], max_tasks: int) -> pd.DataFrame:
+        """Restrict timeline tasks to a due-date window and the top ``max_tasks``"""
+        due_dates = pd.to_datetime(df['due_date']) if 'due_date' in df.columns else pd.Series(pd.NaT, index=df.index)
+        
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= due_dates >= start
+        if end is not None:
+            mask &= due_dates <= end
+        df = df.assign(due_date=due_dates)[mask]
+        
+        # Keep the highest priority tasks, earliest due first, then draw them in due order
+        if len(df) > max_tasks:
+            df = df.sort_values(['priority', 'due_date'], ascending=[False, True]).head(max_tasks)
+        return df.sort_values('due_date', kind='stable')
+    
     def create_productivity_heatmap(self, analytics_data: Dict) -> go.Figure:
         """Create a heatmap showing productivity patterns"""
-        if 'most_productive_hours' not in analytics_data:
+        chart = self.productivity_heatmap_data(analytics_data)
+        if chart is None:
             return None
+        return self._create_productivity_heatmap_chart(chart)
+    
+    def productivity_heatmap_data(self, analytics_data: Dict) -> Optional[Dict]:
+        """Compact chart data for the productivity heatmap (24 hours x 7 days)"""
+        matrix = analytics_data.get('productivity_matrix')
+        if matrix is not None:
+            # Stored weekday-major as 7x24; the chart wants hours down, days across
+            data = np.asarray(matrix, dtype=np.int64).reshape(7, 24).T
+            return {'spec': 'productivity_heatmap', 'z': np.ascontiguousarray(data)}
         
-        hours = json.loads(analytics_data['most_productive_hours']) if isinstance(analytics_data['most_productive_hours'], str) else analytics_data['most_productive_hours']
-        
-        # Create a 24x7 matrix for hours and days
-        data = [[0 for _ in range(7)] for _ in range(24)]
+        if 'most_productive_hours' not in analytics_data:
+            return None
         
-        # Fill in the data
+        # Without a weekday breakdown, spread each hour's total across the week
+        hours = self._load_json(analytics_data['most_productive_hours'])
+        totals = np.zeros(24)
         for hour, productivity in hours.items():
-            hour = int(hour)
-            for day in range(7):
-                data[hour][day] = productivity
+            totals[int(hour)] = productivity
+        
+        return {'spec': 'productivity_heatmap', 'z': np.repeat(totals[:, np.newaxis], 7, axis=1)}
+    
+    def _create_productivity_heatmap_chart(self, chart: Dict) -> go.Figure:
+        """Create a heatmap from a 24x7 hour-by-day matrix"""
+        import plotly.graph_objects as go
         
         fig = go.Figure(data=go.Heatmap(
-            z=data,
+            z=chart['z'],
             x=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
             y=list(range(24)),
             colorscale='Viridis'
@@ -171,39 +288,51 @@ class DataVisualizer:
     
     def create_performance_metrics(self, analytics_data: Dict) -> Dict[str, go.Figure]:
         """Create performance metric visualizations"""
+        return {
+            name: self.build_figure(chart)
+            for name, chart in self.performance_metrics_data(analytics_data).items()
+        }
+    
+    def performance_metrics_data(self, analytics_data: Dict) -> Dict[str, Dict]:
+        """Compact chart data for the performance metrics"""
         metrics = {}
         
         # Completion rate gauge
         if 'completion_rate' in analytics_data:
-            metrics['completion_rate_gauge'] = self._create_gauge_chart(
-                analytics_data['completion_rate'],
-                'Task Completion Rate',
-                '%'
-            )
+            metrics['completion_rate_gauge'] = {
+                'spec': 'gauge',
+                'value': analytics_data['completion_rate'],
+                'title': 'Task Completion Rate',
+                'unit': '%'
+            }
         
         # Productivity score gauge
         if 'productivity_score' in analytics_data:
-            metrics['productivity_gauge'] = self._create_gauge_chart(
-                analytics_data['productivity_score'],
-                'Productivity Score',
-                'points'
-            )
+            metrics['productivity_gauge'] = {
+                'spec': 'gauge',
+                'value': analytics_data['productivity_score'],
+                'title': 'Productivity Score',
+                'unit': 'points'
+            }
         
         # Streak counter
         if 'current_streak' in analytics_data:
-            metrics['streak_counter'] = self._create_streak_counter(
-                analytics_data['current_streak'],
-                analytics_data.get('longest_streak', 0)
-            )
+            metrics['streak_counter'] = {
+                'spec': 'streak_counter',
+                'current': analytics_data['current_streak'],
+                'longest': analytics_data.get('longest_streak', 0)
+            }
         
         return metrics
     
-    def _create_gauge_chart(self, value: float, title: str, unit: str) -> go.Figure:
+    def _create_gauge_chart(self, chart: Dict) -> go.Figure:
         """Create a gauge chart for metrics"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
-            value=value,
-            title={'text': title},
+            value=chart['value'],
+            title={'text': chart['title']},
             gauge={
                 'axis': {'range': [0, 100]},
                 'bar': {'color': self.color_palette[0]},
@@ -227,14 +356,16 @@ class DataVisualizer:
         
         return fig
     
-    def _create_streak_counter(self, current_streak: int, longest_streak: int) -> go.Figure:
+    def _create_streak_counter(self, chart: Dict) -> go.Figure:
         """Create a streak counter visualization"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         # Current streak
         fig.add_trace(go.Indicator(
             mode="number",
-            value=current_streak,
+            value=chart['current'],
             title={'text': "Current Streak"},
             domain={'row': 0, 'column': 0}
         ))
@@ -242,7 +373,7 @@ class DataVisualizer:
         # Longest streak
         fig.add_trace(go.Indicator(
             mode="number",
-            value=longest_streak,
+            value=chart['longest'],
             title={'text': "Longest Streak"},
             domain={'row': 0, 'column': 1}
         ))
@@ -257,38 +388,67 @@ class DataVisualizer:
     
     def create_task_analysis_report(self, tasks: List[Dict]) -> Dict[str, go.Figure]:
         """Create a comprehensive task analysis report"""
+        return {
+            name: self.build_figure(chart)
+            for name, chart in self.task_analysis_data(tasks).items()
+        }
+    
+    def task_analysis_data(self, tasks: List[Dict]) -> Dict[str, Dict]:
+        """Compact chart data for the task analysis report"""
         report = {}
         
-        if not tasks:
+        if len(tasks) == 0:
             return report
         
         df = pd.DataFrame(tasks)
         
         # Task status distribution
         if 'status' in df.columns:
-            report['status_distribution'] = self._create_status_distribution_chart(df)
+            status_counts = df['status'].value_counts()
+            report['status_distribution'] = {
+                'spec': 'status_distribution',
+                'labels': status_counts.index.tolist(),
+                'values': status_counts.to_numpy()
+            }
         
         # Task priority distribution
         if 'priority' in df.columns:
-            report['priority_distribution'] = self._create_priority_distribution_chart(df)
+            priority_counts = df['priority'].value_counts().sort_index()
+            report['priority_distribution'] = {
+                'spec': 'priority_distribution',
+                'x': priority_counts.index.to_numpy(),
+                'y': priority_counts.to_numpy()
+            }
         
         # Task duration analysis
         if 'estimated_duration' in df.columns:
-            report['duration_analysis'] = self._create_duration_analysis_chart(df)
+            report['duration_analysis'] = {
+                'spec': 'duration_analysis',
+                'estimated': df['estimated_duration'].to_numpy(dtype=float),
+                'actual': df['actual_duration'].to_numpy(dtype=float) if 'actual_duration' in df.columns else None
+            }
         
         # Task category analysis
         if 'category' in df.columns:
-            report['category_analysis'] = self._create_category_analysis_chart(df)
+            category_status = pd.crosstab(df['category'], df['status'])
+            report['category_analysis'] = {
+                'spec': 'category_analysis',
+                'categories': category_status.index.tolist(),
+                'series': [
+                    {'name': status, 'y': category_status[status].to_numpy()}
+                    for status in category_status.columns
+                ]
+            }
         
         return report
     
-    def _create_status_distribution_chart(self, df: pd.DataFrame) -> go.Figure:
+    def _create_status_distribution_chart(self, chart: Dict) -> go.Figure:
         """Create a pie chart showing task status distribution"""
-        status_counts = df['status'].value_counts()
+        import plotly.graph_objects as go
         
         fig = go.Figure(data=[go.Pie(
-            labels=status_counts.index,
-            values=status_counts.values,
+            labels=chart['labels'],
+            values=chart['values'],
             hole=.3,
             marker_colors=self.color_palette
         )])
@@ -300,13 +460,13 @@ class DataVisualizer:
         
         return fig
     
-    def _create_priority_distribution_chart(self, df: pd.DataFrame) -> go.Figure:
+    def _create_priority_distribution_chart(self, chart: Dict) -> go.Figure:
         """Create a bar chart showing task priority distribution"""
-        priority_counts = df['priority'].value_counts().sort_index()
+        import plotly.graph_objects as go
         
         fig = go.Figure(data=[go.Bar(
-            x=priority_counts.index,
-            y=priority_counts.values,
+            x=chart['x'],
+            y=chart['y'],
             marker_color=self.color_palette[1]
         )])
         
@@ -319,19 +479,21 @@ class DataVisualizer:
         
         return fig
     
-    def _create_duration_analysis_chart(self, df: pd.DataFrame) -> go.Figure:
+    def _create_duration_analysis_chart(self, chart: Dict) -> go.Figure:
         """Create a box plot showing task duration distribution"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
         
         fig.add_trace(go.Box(
-            y=df['estimated_duration'],
+            y=chart['estimated'],
             name='Estimated Duration',
             marker_color=self.color_palette[2]
         ))
         
-        if 'actual_duration' in df.columns:
+        if chart['actual'] is not None:
             fig.add_trace(go.Box(
-                y=df['actual_duration'],
+                y=chart['actual'],
                 name='Actual Duration',
                 marker_color=self.color_palette[3]
             ))
@@ -344,18 +506,18 @@ class DataVisualizer:
         
         return fig
     
-    def _create_category_analysis_chart(self, df: pd.DataFrame) -> go.Figure:
+    def _create_category_analysis_chart(self, chart: Dict) -> go.Figure:
         """Create a stacked bar chart showing task category analysis"""
-        category_status = pd.crosstab(df['category'], df['status'])
+        import plotly.graph_objects as go
         
         fig = go.Figure()
         
-        for status in category_status.columns:
+        for index, series in enumerate(chart['series']):
             fig.add_trace(go.Bar(
-                x=category_status.index,
-                y=category_status[status],
-                name=status,
-                marker_color=self.color_palette[list(category_status.columns).index(status) % len(self.color_palette)]
+                x=chart['categories'],
+                y=series['y'],
+                name=series['name'],
+                marker_color=self.color_palette[index % len(self.color_palette)]
             ))
         
         fig.update_layout(
@@ -366,4 +528,26 @@ class DataVisualizer:
             barmode='stack'
         )
         
-        return fig 
\ No newline at end of file
+        return fig
+    
+    def build_figure(self, chart: Dict) -> go.Figure:
+        """Draw a Plotly figure from chart data produced by a ``*_data`` method"""
+        builders = {
+            'completion_rate': self._create_completion_rate_chart,
+            'category_distribution': self._create_category_distribution_chart,
+            'productivity_by_hour': self._create_productivity_by_hour_chart,
+            'complexity_distribution': self._create_complexity_distribution_chart,
+            'task_timeline': self._create_task_timeline_chart,
+            'productivity_heatmap': self._create_productivity_heatmap_chart,
+            'gauge': self._create_gauge_chart,
+            'streak_counter': self._create_streak_counter,
+            'status_distribution': self._create_status_distribution_chart,
+            'priority_distribution': self._create_priority_distribution_chart,
+            'duration_analysis': self._create_duration_analysis_chart,
+            'category_analysis': self._create_category_analysis_chart
+        }
+        return builders[chart['spec']](chart)
+    
+    @staticmethod
+    def _load_json(value):
+        return json.loads(value) if isinstance(value, str) else value
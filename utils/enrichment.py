@@ -0,0 +1,140 @@
+from app import db
+from models.task import Task
+from models.analytics import UserAnalytics
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+def claim_pending_tasks(batch_size: int) -> List[Task]:
+    """Lock the oldest tasks still waiting for enrichment
+
+    On PostgreSQL the rows are locked with SKIP LOCKED, so several workers can
+    drain the queue without handing out the same task twice.
+    """
+    query = Task.query.filter_by(enrichment_state='pending').order_by(Task.id.asc()).limit(batch_size)
+    if db.session.connection().dialect.name == 'postgresql':
+        query = query.with_for_update(skip_locked=True, of=Task)
+    return query.all()
+
+def _count_created(tasks: List[Task]):
+    """Add newly accepted tasks to their owners' creation counters"""
+    for user_id, count in Counter(task.user_id for task in tasks).items():
+        UserAnalytics.query.filter_by(user_id=user_id).update(
+            {UserAnalytics.total_tasks_created: UserAnalytics.total_tasks_created + count},
+            synchronize_session=False
+        )
+
+def _summaries_by_user(tasks: List[Task]) -> Dict[int, List[Dict]]:
+    summaries = {}
+    for task in tasks:
+        summaries.setdefault(task.user_id, []).append(
+            dict(task.to_summary_dict(), enrichment_state=task.enrichment_state)
+        )
+    return summaries
+
+def enrich_pending_tasks(nlp_processor, ml_engine, batch_size: int = 32,
+                         on_enriched: Optional[Callable[[int, List[Dict]], None]] = None) -> int:
+    """Fill in the NLP and ML fields of one batch of pending tasks
+
+    Descriptions are parsed with a single spaCy pipe and priorities predicted
+    with one model call. A batch that fails is marked 'failed' rather than
+    retried forever. ``on_enriched`` is called with each owner's id and the
+    summaries of their processed tasks. Returns the number of tasks taken off
+    the queue.
+    """
+    tasks = claim_pending_tasks(batch_size)
+    if not tasks:
+        db.session.rollback()
+        return 0
+
+    task_ids = [task.id for task in tasks]
+
+    try:
+        task_data_list = nlp_processor.process_task_inputs(
+            [task.description or task.title for task in tasks], batch_size=batch_size
+        )
+        priorities = ml_engine.predict_priorities(task_data_list)
+
+        for task, task_data, priority in zip(tasks, task_data_list, priorities):
+            task.title = task_data['title'] or task.title
+            task.due_date = task.due_date or task_data['due_date']
+            task.category = task_data['category']
+            task.complexity_score = task_data['complexity_score']
+            task.sentiment_score = task_data['sentiment_score']
+            task.keywords = json.dumps(task_data['keywords'])
+            task.estimated_duration = task_data['estimated_duration']
+            task.priority = priority
+            task.enrichment_state = 'done'
+
+        _count_created(tasks)
+        summaries = _summaries_by_user(tasks)
+        db.session.commit()
+    except Exception:
+        logger.exception('Enrichment failed for tasks %s', task_ids)
+        db.session.rollback()
+
+        tasks = Task.query.filter(Task.id.in_(task_ids)).all()
+        for task in tasks:
+            task.enrichment_state = 'failed'
+        _count_created(tasks)
+        summaries = _summaries_by_user(tasks)
+        db.session.commit()
+
+    if on_enriched:
+        for user_id, user_tasks in summaries.items():
+            on_enriched(user_id, user_tasks)
+
+    return len(task_ids)
+
+class EnrichmentWorker:
+    """Background thread that drains the enrichment queue in batches
+
+    The tasks table is the queue: intake inserts rows with
+    enrichment_state='pending' and wakes the worker, which also polls so that
+    rows left behind by a restart are picked up. A separate process can drain
+    the same queue with `flask enrich-tasks --loop`.
+    """
+
+    def __init__(self, nlp_processor, ml_engine,
+                 on_enriched: Optional[Callable[[int, List[Dict]], None]] = None):
+        self.nlp_processor = nlp_processor
+        self.ml_engine = ml_engine
+        self.on_enriched = on_enriched
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def notify(self, app):
+        """Wake the worker, starting it first if this process has none"""
+        with self._lock:
+            # Threads do not survive a fork, so each worker process starts its own
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, args=(app,),
+                                                name='task-enrichment', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self, app):
+        batch_size = app.config['TASK_ENRICHMENT_BATCH_SIZE']
+        interval = app.config['TASK_ENRICHMENT_INTERVAL']
+
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+            with app.app_context():
+                try:
+                    while enrich_pending_tasks(self.nlp_processor, self.ml_engine,
+                                               batch_size, self.on_enriched):
+                        pass
+                except Exception:
+                    logger.exception('Task enrichment worker error')
+                finally:
+                    db.session.remove()
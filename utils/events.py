@@ -0,0 +1,88 @@
+from typing import Any, Dict, Hashable, Iterator, List
+import itertools
+import json
+import queue
+import threading
+
+class EventBroker:
+    """In-process publish/subscribe hub for server-sent events
+
+    Every open stream gets its own bounded queue. Publishing never blocks: a
+    subscriber that falls behind loses its oldest events rather than slowing
+    down the request that changed the data. Events only reach streams served
+    by the same process.
+    """
+
+    def __init__(self, max_queue: int = 100, heartbeat: float = 15.0):
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Dict[Hashable, List[queue.Queue]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure queue size and heartbeat interval from the app config"""
+        self.max_queue = app.config.get('EVENT_QUEUE_SIZE', self.max_queue)
+        self.heartbeat = app.config.get('EVENT_HEARTBEAT', self.heartbeat)
+
+    def subscribe(self, user_id: Hashable) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id: Hashable, subscriber: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id: Hashable, event: str, data: Any = None):
+        """Send an event to every open stream of a user"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+            if not subscribers:
+                return
+            message = (f'id: {next(self._ids)}\nevent: {event}\n'
+                       f'data: {json.dumps(data, default=str)}\n\n')
+            self.published += 1
+
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait(message)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                        with self._lock:
+                            self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def stream(self, user_id: Hashable) -> Iterator[str]:
+        """Yield SSE messages for a user until the client disconnects"""
+        subscriber = self.subscribe(user_id)
+        try:
+            # Ask the browser to reconnect after 3 seconds if the stream drops
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    yield subscriber.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # Comment lines keep proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+        finally:
+            self.unsubscribe(user_id, subscriber)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'streams': sum(len(subscribers) for subscribers in self._subscribers.values()),
+                'published': self.published,
+                'dropped': self.dropped
+            }
@@ -0,0 +1,190 @@
+from app import db
+from models.task import Task
+from datetime import datetime
+from typing import Dict, Iterable, Iterator
+from utils.task_serializer import to_records
+import csv
+import io
+import json
+import orjson
+import zlib
+
+# Columns streamed for each exported task, in output order
+EXPORT_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.priority,
+    Task.due_date, Task.created_at, Task.updated_at, Task.completed_at,
+    Task.category, Task.complexity_score, Task.tags,
+    Task.estimated_duration, Task.actual_duration
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS] + ['is_completed', 'is_overdue']
+
+# Flush streamed output once roughly this many characters are buffered
+CHUNK_SIZE = 64 * 1024
+
+def iter_task_records(user_id: int, batch_size: int = 1000) -> Iterator[Dict]:
+    """Yield a user's tasks as export records without loading them all at once
+    
+    Rows are fetched as plain tuples through a server-side cursor, so memory
+    stays bounded by ``batch_size`` rather than by the number of tasks. Each
+    batch is converted column-wise by the task serializer.
+    """
+    now = datetime.utcnow()
+    result = db.session.execute(
+        db.select(*EXPORT_COLUMNS).where(
+            Task.user_id == user_id
+        ).order_by(Task.id).execution_options(yield_per=batch_size)
+    )
+    
+    for rows in result.partitions():
+        yield from to_records(rows, EXPORT_COLUMNS, now=now)
+
+def _chunked(parts: Iterable[str]) -> Iterator[str]:
+    """Coalesce many small strings into chunks of about CHUNK_SIZE characters"""
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+def stream_json(records: Iterable[Dict], analytics: Dict) -> Iterator[str]:
+    """Stream the classic export document one task at a time"""
+    def parts():
+        yield '{"analytics": ' + json.dumps(analytics)
+        yield ', "export_date": ' + json.dumps(datetime.utcnow().isoformat())
+        yield ', "tasks": ['
+        for index, record in enumerate(records):
+            yield (', ' if index else '') + orjson.dumps(record).decode('utf-8')
+        yield ']}'
+    
+    return _chunked(parts())
+
+def stream_ndjson(records: Iterable[Dict]) -> Iterator[str]:
+    """Stream one JSON object per line"""
+    return _chunked(orjson.dumps(record).decode('utf-8') + '\n' for record in records)
+
+def stream_csv(records: Iterable[Dict]) -> Iterator[str]:
+    """Stream records as CSV with a header row; tags are JSON encoded"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    
+    for record in records:
+        record['tags'] = json.dumps(record['tags'])
+        writer.writerow(record)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue()
+
+def require_pyarrow():
+    """Import pyarrow, which is only needed for the columnar formats"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError('The Arrow and Parquet formats require the pyarrow package')
+    return pyarrow
+
+def arrow_schema(pa):
+    """Arrow schema matching EXPORT_COLUMNS"""
+    timestamp = pa.timestamp('us')
+    return pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('status', pa.string()),
+        ('priority', pa.int32()),
+        ('due_date', timestamp),
+        ('created_at', timestamp),
+        ('updated_at', timestamp),
+        ('completed_at', timestamp),
+        ('category', pa.string()),
+        ('complexity_score', pa.float64()),
+        ('tags', pa.list_(pa.string())),
+        ('estimated_duration', pa.int32()),
+        ('actual_duration', pa.int32())
+    ])
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_columnar(user_id: int, file_format: str = 'arrow', batch_size: int = 50000) -> Iterator[bytes]:
+    """Stream a user's tasks as an Arrow IPC stream or a Parquet file
+    
+    Each batch of ``batch_size`` rows becomes one record batch (or one Parquet
+    row group) and is flushed to the client before the next one is fetched.
+    """
+    pa = require_pyarrow()
+    schema = arrow_schema(pa)
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode='w')
+    
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_stream(output, schema)
+    
+    result = db.session.execute(
+        db.select(*EXPORT_COLUMNS).where(
+            Task.user_id == user_id
+        ).order_by(Task.id).execution_options(yield_per=batch_size)
+    )
+    
+    for rows in result.partitions():
+        columns = [list(column) for column in zip(*rows)]
+        tags = schema.get_field_index('tags')
+        columns[tags] = [orjson.loads(value) if isinstance(value, str) else value for value in columns[tags]]
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+        
+        if file_format == 'parquet':
+            writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            writer.write_batch(batch)
+        
+        data = sink.drain()
+        if data:
+            yield data
+    
+    writer.close()
+    yield sink.drain()
+
+def gzip_stream(chunks: Iterable, level: int = 6) -> Iterator[bytes]:
+    """Compress a text or bytes stream into a gzip stream on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
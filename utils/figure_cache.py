@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+from utils.instrumentation import span
+import hashlib
+import json
+import threading
+
+class FigureCache:
+    """LRU cache of serialized Plotly figures
+
+    Entries are keyed by user, chart type and a hash of the aggregates the
+    chart is built from, so a repeat request with unchanged data skips Plotly
+    entirely. Each user's entries can be dropped at once when their tasks
+    change.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._user_keys: Dict[Hashable, Set[Tuple]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the cache size from the app config"""
+        self.max_entries = app.config.get('FIGURE_CACHE_SIZE', self.max_entries)
+
+    @staticmethod
+    def make_key(user_id: Hashable, chart_type: str, inputs: Any) -> Tuple:
+        """Build a cache key from the chart inputs' content hash"""
+        payload = json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')
+        return (user_id, chart_type, hashlib.sha1(payload).hexdigest())
+
+    def get_or_build(self, user_id: Hashable, chart_type: str, inputs: Any,
+                     build: Callable[[], Any]) -> Any:
+        """Return the cached figure JSON, building and storing it on a miss
+
+        ``build`` may return a figure, ``None`` or a dict of figures; the cached
+        value mirrors that shape with each figure replaced by its JSON.
+        """
+        key = self.make_key(user_id, chart_type, inputs)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = self._serialize(build())
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._user_keys.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._discard_user_key(evicted)
+
+        return value
+
+    def invalidate_user(self, user_id: Hashable):
+        """Drop every cached figure for a user"""
+        with self._lock:
+            for key in self._user_keys.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _discard_user_key(self, key: Tuple):
+        keys = self._user_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[key[0]]
+
+    @staticmethod
+    def _serialize(value: Any) -> Optional[Any]:
+        # Plotly is only imported once a figure actually has to be serialized
+        import plotly.io as pio
+
+        if value is None:
+            return None
+        with span('plotly.serialize'):
+            if isinstance(value, dict):
+                return {name: pio.to_json(figure, validate=False) for name, figure in value.items()}
+            return pio.to_json(value, validate=False)
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'checked_at')
+
+    def __init__(self, value: Any, ttl: float):
+        self.value = value
+        self.checked_at = time.monotonic()
+        self.expires_at = self.checked_at + ttl
+
+class IdentityCache:
+    """Short-lived, size-bounded cache of detached objects keyed by id
+
+    Used by the Flask-Login user loader so that an authenticated request does
+    not have to reload its user from the database. Entries expire after
+    ``ttl`` seconds and are dropped explicitly whenever the account changes.
+    The cache is per process, so an entry older than ``max_age`` seconds is
+    revalidated with the caller's check before it is served, which bounds
+    how long a change made by another worker can go unnoticed.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 1024, max_age: float = 1.0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the TTL, size and revalidation age from the app config"""
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('IDENTITY_CACHE_SIZE', self.max_entries)
+        self.max_age = app.config.get('IDENTITY_CACHE_MAX_AGE', self.max_age)
+
+    def get(self, key: Hashable, revalidate: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired
+
+        Once an entry is older than ``max_age``, ``revalidate`` is called with
+        it; if that returns False the entry is dropped and None returned.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if revalidate is None or now - entry.checked_at < self.max_age:
+                self.hits += 1
+                return entry.value
+
+        # Run the check outside the lock; it usually queries the database
+        if not revalidate(entry.value):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                self.misses += 1
+            return None
+        with self._lock:
+            entry.checked_at = now
+            self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = _Entry(value, self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
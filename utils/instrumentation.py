@@ -0,0 +1,158 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Dict, Iterable, List, Tuple
+import functools
+import threading
+import time
+
+# Latency buckets in seconds, from a cached lookup up to a slow Plotly build
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Histogram:
+    """Prometheus-style latency histogram with a fixed label set"""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = [(labels, list(counts), total, count)
+                      for labels, (counts, total, count) in sorted(self._series.items())]
+
+        for labels, counts, total, count in series:
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f'{{{label_text}}}' if label_text else ''
+            lines.append(f'{self.name}_sum{suffix} {total}')
+            lines.append(f'{self.name}_count{suffix} {count}')
+        return lines
+
+REQUEST_DURATION = Histogram(
+    'opal_request_duration_seconds', 'Time spent serving requests.', ('endpoint', 'method')
+)
+STAGE_DURATION = Histogram(
+    'opal_stage_duration_seconds', 'Time spent in instrumented stages such as NLP, ML, SQL and charts.',
+    ('stage',)
+)
+
+enabled = True
+
+def record_stage(stage: str, elapsed: float):
+    """Add a stage duration to the histograms and the current request's breakdown"""
+    if not enabled:
+        return
+    STAGE_DURATION.observe(elapsed, stage)
+    if has_request_context():
+        timings = g.setdefault('stage_timings', {})
+        timings[stage] = timings.get(stage, 0.0) + elapsed
+
+@contextmanager
+def span(stage: str):
+    """Time a block of work as a named stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def instrumented(stage: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# The start time lives on the execution context, which is discarded with a
+# failed statement; after_cursor_execute does not fire for those
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._opal_query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_opal_query_started', None)
+    if started is not None:
+        record_stage('sql', time.perf_counter() - started)
+
+def render_samples(samples: Iterable[Tuple[str, str, str, float]]) -> List[str]:
+    """Render (name, type, help, value) samples such as gauges and counters"""
+    lines = []
+    for name, kind, documentation, value in samples:
+        lines.extend([f'# HELP {name} {documentation}', f'# TYPE {name} {kind}', f'{name} {value}'])
+    return lines
+
+def render_metrics(samples: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+    """Render every histogram plus the given samples in Prometheus text format"""
+    lines = REQUEST_DURATION.render() + STAGE_DURATION.render() + render_samples(samples)
+    return '\n'.join(lines) + '\n'
+
+class Instrumentation:
+    """Request timing, SQL timing and the Server-Timing header
+
+    Spans cost two perf_counter() calls and a histogram update, so this is
+    meant to stay on in production; INSTRUMENTATION_ENABLED turns it off.
+    """
+
+    def init_app(self, app):
+        global enabled
+        enabled = app.config.get('INSTRUMENTATION_ENABLED', True)
+        if not enabled:
+            return
+
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def _start_request():
+        g.request_started = time.perf_counter()
+
+    @staticmethod
+    def _finish_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        REQUEST_DURATION.observe(elapsed, request.endpoint or 'unmatched', request.method)
+
+        # Stages overlap when nested (e.g. sql inside nlp), so they do not sum to total
+        timings = g.get('stage_timings', {})
+        entries = [f'{stage};dur={duration * 1000:.1f}' for stage, duration in timings.items()]
+        entries.append(f'total;dur={elapsed * 1000:.1f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+        return response
@@ -0,0 +1,75 @@
+from typing import Dict, List, Optional
+from utils.instrumentation import instrumented
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Import and construction time of every service loaded so far, in milliseconds
+load_times: Dict[str, Dict[str, float]] = {}
+
+_instances: List['LazyInstance'] = []
+
+class LazyInstance:
+    """Proxy that imports and builds a service the first time it is used
+
+    Blueprints hold these instead of NLPProcessor, MLEngine or DataVisualizer
+    instances so that importing a blueprint does not pull in spaCy, NLTK,
+    scikit-learn, pandas or Plotly. Attribute access is forwarded to the real
+    instance once it exists; with a ``stage`` name, public method calls are
+    also timed as ``<stage>.<method>`` spans.
+    """
+
+    def __init__(self, module_name: str, class_name: str, *args, stage: Optional[str] = None, **kwargs):
+        self._module_name = module_name
+        self._class_name = class_name
+        self._stage = stage
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+        self._lock = threading.Lock()
+        _instances.append(self)
+
+    @property
+    def name(self) -> str:
+        return f'{self._module_name}.{self._class_name}'
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self):
+        """Import the module and construct the instance if not done yet"""
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self._module_name)
+                imported = time.perf_counter()
+                instance = getattr(module, self._class_name)(*self._args, **self._kwargs)
+                finished = time.perf_counter()
+
+                load_times[self.name] = {
+                    'import_ms': (imported - started) * 1000,
+                    'init_ms': (finished - imported) * 1000
+                }
+                logger.info('Loaded %s in %.1f ms (import %.1f ms)', self.name,
+                            (finished - started) * 1000, (imported - started) * 1000)
+                self._instance = instance
+
+        return self._instance
+
+    def __getattr__(self, name):
+        value = getattr(self.load(), name)
+        if self._stage and callable(value) and not name.startswith('_'):
+            return instrumented(f'{self._stage}.{name}')(value)
+        return value
+
+def warm_all():
+    """Load every registered service, e.g. before forking workers"""
+    for instance in list(_instances):
+        instance.load()
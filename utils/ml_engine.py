@@ -4,9 +4,70 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from datetime import datetime, timedelta
 import pandas as pd
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 import joblib
 import os
+from utils.task_frame import TaskFrame
+
+def _present(value) -> bool:
+    """False for None and for the NaN/NaT that frame rows carry instead"""
+    return value is not None and not pd.isna(value)
+
+def _number(value) -> float:
+    return value if _present(value) else 0
+
+def _pandas_pattern_inputs(df: pd.DataFrame) -> Dict:
+    """Arrays read by analyze_task_patterns, from a DataFrame's columns"""
+    inputs = dict.fromkeys(('completed', 'category_codes', 'categories', 'hours', 'durations'))
+    
+    if 'status' in df.columns:
+        inputs['completed'] = (df['status'] == 'completed').to_numpy(dtype=np.float64)
+    
+    if 'category' in df.columns:
+        codes, categories = pd.factorize(df['category'], sort=True)
+        inputs['category_codes'] = codes
+        inputs['categories'] = categories.tolist()
+    
+    if 'completed_at' in df.columns:
+        completed_at = df['completed_at']
+        if not pd.api.types.is_datetime64_any_dtype(completed_at):
+            completed_at = pd.to_datetime(completed_at)
+        hours = completed_at.dt.hour
+        local_hours = df.get('completed_local_hour')
+        if local_hours is not None:
+            hours = local_hours.where(local_hours.notna() & completed_at.notna(), hours)
+        inputs['hours'] = hours.fillna(-1).to_numpy(dtype=np.int64)
+    
+    if 'actual_duration' in df.columns:
+        inputs['durations'] = pd.to_numeric(df['actual_duration']).to_numpy(dtype=np.float64)
+    
+    return inputs
+
+def _frame_pattern_inputs(frame: TaskFrame) -> Dict:
+    """Arrays read by analyze_task_patterns, straight from a TaskFrame's codes"""
+    columns = frame.columns
+    
+    # Re-rank category codes into sorted name order; -1 (no category) stays -1
+    categories = frame.categories['category']
+    order = sorted(range(len(categories)), key=categories.__getitem__)
+    rank = np.full(len(categories) + 1, -1, dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    
+    # Local completion hours, falling back to the UTC hour for rows written
+    # before they were recorded
+    completed_at = columns['completed_at']
+    hours = completed_at.astype('datetime64[h]').astype(np.int64) % 24
+    local_hours = columns['completed_local_hour']
+    hours = np.where(local_hours >= 0, local_hours, hours)
+    hours[np.isnat(completed_at)] = -1
+    
+    return {
+        'completed': (columns['status'] == frame.code('status', 'completed')).astype(np.float64),
+        'category_codes': rank[columns['category']],
+        'categories': [categories[index] for index in order],
+        'hours': hours,
+        'durations': columns['actual_duration']
+    }
 
 class MLEngine:
     def __init__(self, model_path: str = 'models/ml_models'):
@@ -52,14 +113,14 @@ class MLEngine:
         
         # Extract numerical features
         features.extend([
-            task_data.get('complexity_score', 0),
-            task_data.get('sentiment_score', 0),
-            len(task_data.get('keywords', [])),
-            task_data.get('estimated_duration', 0) / 60 if task_data.get('estimated_duration') else 0,
+            _number(task_data.get('complexity_score')),
+            _number(task_data.get('sentiment_score')),
+            len(task_data.get('keywords') or []),
+            _number(task_data.get('estimated_duration')) / 60,
         ])
         
         # Add time-based features
-        if task_data.get('due_date'):
+        if _present(task_data.get('due_date')):
             days_until_due = (task_data['due_date'] - datetime.utcnow()).days
             features.append(days_until_due)
         else:
@@ -141,6 +202,14 @@ class MLEngine:
         priority = self.priority_model.predict(features_scaled)[0]
         return int(priority)
     
+    def predict_priorities(self, task_data_list: List[Dict]) -> List[int]:
+        """Predict priorities for several tasks with one model call"""
+        if not task_data_list:
+            return []
+        features = np.vstack([self.prepare_features(task_data) for task_data in task_data_list])
+        features_scaled = self.scaler.transform(features)
+        return [int(priority) for priority in self.priority_model.predict(features_scaled)]
+    
     def predict_duration(self, task_data: Dict) -> int:
         """Predict task duration in minutes"""
         features = self.prepare_features(task_data)
@@ -148,12 +217,25 @@ class MLEngine:
         duration = self.duration_model.predict(features_scaled)[0]
         return int(duration)
     
-    def analyze_task_patterns(self, historical_data: List[Dict]) -> Dict:
-        """Analyze patterns in task completion"""
-        if not historical_data:
+    def analyze_task_patterns(self, historical_data: Union[List[Dict], pd.DataFrame, TaskFrame]) -> Dict:
+        """Analyze patterns in task completion
+        
+        All tables come from one pass of boolean masks and np.bincount over
+        category codes and completion hours. Hours are the local completion
+        hours recorded at write time, or the UTC hour of ``completed_at`` for
+        tasks without one; for such input the keys, ordering and values match
+        the earlier groupby version. Accepts task dicts, a DataFrame, or a
+        TaskFrame, whose codes are used as they are.
+        """
+        if len(historical_data) == 0:
             return {}
         
-        df = pd.DataFrame(historical_data)
+        if isinstance(historical_data, TaskFrame):
+            inputs = _frame_pattern_inputs(historical_data)
+        elif isinstance(historical_data, pd.DataFrame):
+            inputs = _pandas_pattern_inputs(historical_data)
+        else:
+            inputs = _pandas_pattern_inputs(pd.DataFrame(historical_data))
         
         patterns = {
             'completion_by_category': {},
@@ -163,38 +245,57 @@ class MLEngine:
             'common_dependencies': {}
         }
         
-        # Analyze completion by category
-        if 'category' in df.columns and 'status' in df.columns:
-            category_completion = df.groupby('category')['status'].apply(
-                lambda x: (x == 'completed').mean()
-            ).to_dict()
-            patterns['completion_by_category'] = category_completion
-        
-        # Analyze completion by time of day
-        if 'completed_at' in df.columns:
-            df['hour'] = pd.to_datetime(df['completed_at']).dt.hour
-            time_completion = df.groupby('hour')['status'].apply(
-                lambda x: (x == 'completed').mean()
-            ).to_dict()
-            patterns['completion_by_time'] = time_completion
-        
-        # Analyze average duration by category
-        if 'category' in df.columns and 'actual_duration' in df.columns:
-            duration_by_category = df.groupby('category')['actual_duration'].mean().to_dict()
-            patterns['average_duration_by_category'] = duration_by_category
-        
-        # Calculate success rate by category
-        if 'category' in df.columns and 'status' in df.columns:
-            success_rate = df.groupby('category').apply(
-                lambda x: (x['status'] == 'completed').mean()
-            ).to_dict()
-            patterns['success_rate_by_category'] = success_rate
+        completed = inputs['completed']
+        category_codes = inputs['category_codes']
+        
+        if category_codes is not None:
+            categories = inputs['categories']
+            known = category_codes >= 0
+            codes = category_codes[known]
+            
+            # A merged TaskFrame keeps categories no task uses any more; like
+            # groupby, only categories with tasks are reported
+            totals = np.bincount(codes, minlength=len(categories))
+            used = np.flatnonzero(totals)
+            names = [categories[index] for index in used.tolist()]
+            
+            # Completion and success rates by category are the same table
+            if completed is not None:
+                done = np.bincount(codes, weights=completed[known], minlength=len(categories))
+                rates = dict(zip(names, (done[used] / totals[used]).tolist()))
+                patterns['completion_by_category'] = rates
+                patterns['success_rate_by_category'] = dict(rates)
+            
+            # Average duration by category, NaN where no task has one
+            durations = inputs['durations']
+            if durations is not None:
+                measured = known & ~np.isnan(durations)
+                counts = np.bincount(category_codes[measured], minlength=len(categories))
+                sums = np.bincount(category_codes[measured], weights=durations[measured],
+                                   minlength=len(categories))
+                means = np.full(len(categories), np.nan)
+                np.divide(sums, counts, out=means, where=counts > 0)
+                patterns['average_duration_by_category'] = dict(zip(names, means[used].tolist()))
+        
+        # Completion by local hour of day; hours were float keys whenever any
+        # task lacked a completion time, as pandas stored them next to NaN
+        hours = inputs['hours']
+        if hours is not None and completed is not None:
+            timed = hours >= 0
+            totals = np.bincount(hours[timed], minlength=24)
+            done = np.bincount(hours[timed], weights=completed[timed], minlength=24)
+            observed = np.flatnonzero(totals)
+            key = float if not timed.all() else int
+            patterns['completion_by_time'] = dict(zip(
+                map(key, observed.tolist()), (done[observed] / totals[observed]).tolist()
+            ))
         
         return patterns
     
-    def suggest_optimal_schedule(self, tasks: List[Dict], available_hours: int = 8) -> List[Dict]:
+    def suggest_optimal_schedule(self, tasks: Union[List[Dict], pd.DataFrame],
+                                 available_hours: int = 8) -> List[Dict]:
         """Suggest optimal task schedule based on patterns and priorities"""
-        if not tasks:
+        if len(tasks) == 0:
             return []
         
         # Convert tasks to DataFrame for easier manipulation
@@ -229,7 +330,7 @@ class MLEngine:
         
         return schedule
     
-    def detect_task_conflicts(self, tasks: List[Dict]) -> List[Dict]:
+    def detect_task_conflicts(self, tasks: Union[List[Dict], pd.DataFrame]) -> List[Dict]:
         """Detect potential conflicts in task scheduling"""
         conflicts = []
         
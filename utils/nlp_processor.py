@@ -1,18 +1,31 @@
 import spacy
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
+from utils.instrumentation import instrumented, span
 from datetime import datetime, timedelta
 import re
 from typing import Dict, List, Tuple, Optional
 
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('averaged_perceptron_tagger')
-nltk.download('wordnet')
-nltk.download('vader_lexicon')
+# NLTK data required by the processor, as (resource path, package name)
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger'),
+    ('corpora/wordnet', 'wordnet'),
+    ('sentiment/vader_lexicon', 'vader_lexicon')
+]
+
+def ensure_nltk_data():
+    """Download required NLTK data only if it is not installed yet"""
+    for resource, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package, quiet=True)
 
 class NLPProcessor:
     def __init__(self):
+        ensure_nltk_data()
+        
         # Load spaCy model
         self.nlp = spacy.load('en_core_web_sm')
         self.sia = SentimentIntensityAnalyzer()
@@ -42,11 +55,23 @@ class NLPProcessor:
         """
         Process natural language task input and extract structured information
         """
-        doc = self.nlp(text)
-        
+        with span('nlp.spacy'):
+            doc = self.nlp(text)
+        return self._extract_task_data(doc)
+    
+    def process_task_inputs(self, texts: List[str], batch_size: int = 32) -> List[Dict]:
+        """
+        Process several task inputs at once, streaming them through spaCy's pipe
+        """
+        with span('nlp.spacy'):
+            docs = list(self.nlp.pipe(texts, batch_size=batch_size))
+        return [self._extract_task_data(doc) for doc in docs]
+    
+    def _extract_task_data(self, doc) -> Dict:
+        """Extract structured task information from a parsed input"""
         # Extract basic information
         title = self._extract_title(doc)
-        description = text
+        description = doc.text
         
         # Extract due date
         due_date = self._extract_due_date(doc)
@@ -164,6 +189,7 @@ class NLPProcessor:
         
         return min(max(complexity, 0), 1)  # Normalize between 0 and 1
     
+    @instrumented('nlp.vader')
     def _analyze_sentiment(self, doc) -> float:
         """Analyze the sentiment of the task description"""
         sentiment = self.sia.polarity_scores(doc.text)
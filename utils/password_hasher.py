@@ -0,0 +1,124 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import os
+import threading
+import time
+import bcrypt
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already waiting"""
+
+class PasswordHasher:
+    """Runs bcrypt on a small, bounded thread pool and fails fast when full
+
+    The calling request thread still waits for its own hash; the pool does
+    not free it. What the pool bounds is bcrypt CPU per process: at most
+    ``max_workers`` hashes run at once and at most ``max_pending`` are
+    queued or running. A caller that finds no free slot within ``timeout``
+    seconds, meant to be a small fraction of the request budget, gets
+    PasswordHasherBusy instead of piling up behind a login storm.
+
+    The limits are per process and are not shared between workers, so a
+    deployment runs at most processes x ``max_workers`` hashes at once. A
+    sync worker serves one request at a time and never reaches them; they
+    matter for threaded workers, where they stop a login storm from taking
+    every core.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_pending: int = 4,
+                 timeout: float = 0.25):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._configure()
+
+    def init_app(self, app):
+        """Configure the work factor and pool size from the app config"""
+        self.rounds = app.config.get('BCRYPT_ROUNDS', self.rounds)
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS', self.max_workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self._configure()
+
+    def _configure(self):
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1000)
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether a hash was made with a different work factor than configured"""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+            running = self._running
+            completed = self._completed
+            rejected = self._rejected
+
+        return {
+            'rounds': self.rounds,
+            'workers': self.max_workers,
+            'queue_depth': pending - running,
+            'running': running,
+            'completed': completed,
+            'rejected': rejected,
+            'latency_avg_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0,
+            'latency_p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads do not survive a fork, so each worker process builds its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='bcrypt')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy('Password hashing is saturated')
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def work():
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        try:
+            return self._get_executor().submit(work).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._latencies.append(time.perf_counter() - submitted)
+            self._slots.release()
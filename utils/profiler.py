@@ -0,0 +1,109 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+import os
+import sys
+import threading
+import time
+
+# Leaf functions of threads that are blocked waiting rather than working
+IDLE_FUNCTIONS = {'wait', 'select', 'poll', 'epoll', 'accept', 'sleep', '_wait_for_tstate_lock'}
+
+Frame = Tuple[str, str, int]
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is already being taken in this process"""
+
+class SamplingProfiler:
+    """Statistical profiler that samples every thread's stack
+
+    Nothing runs between profiles. While sampling, the calling thread wakes
+    every ``interval`` seconds, reads sys._current_frames() and counts each
+    other thread's stack, so the overhead on request threads is a short GIL
+    hold per sample.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, duration: float, interval: float = 0.005,
+               include_idle: bool = False) -> Counter:
+        """Sample for ``duration`` seconds; return stack (root first) -> count"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy('A profile is already running')
+
+        try:
+            own_thread = threading.get_ident()
+            stacks = Counter()
+            deadline = time.perf_counter() + duration
+
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    if not include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                        continue
+                    stacks[self._stack(frame)] += 1
+                time.sleep(interval)
+
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _stack(frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, frame.f_lineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+def _short_path(filename: str) -> str:
+    """Trim a file path to its package-relative part"""
+    for marker in ('site-packages' + os.sep, os.getcwd() + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return filename
+
+def to_collapsed(stacks: Counter) -> str:
+    """Render stacks in the collapsed format read by flamegraph.pl and speedscope"""
+    lines = []
+    for stack, count in stacks.most_common():
+        frames = ';'.join(f'{name} ({_short_path(filename)}:{line})' for name, filename, line in stack)
+        lines.append(f'{frames} {count}')
+    return '\n'.join(lines) + '\n'
+
+def to_speedscope(stacks: Counter, interval: float, name: str = 'opal') -> Dict:
+    """Render stacks as a speedscope sampled profile"""
+    frames: List[Dict] = []
+    frame_index: Dict[Frame, int] = {}
+    samples: List[List[int]] = []
+    weights: List[float] = []
+
+    for stack, count in stacks.most_common():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': _short_path(frame[1]), 'line': frame[2]})
+            indexes.append(frame_index[frame])
+        samples.append(indexes)
+        weights.append(count * interval)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'opal',
+        'activeProfileIndex': 0,
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights
+        }]
+    }
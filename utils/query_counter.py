@@ -0,0 +1,147 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Dict, List, Optional
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_listening = False
+_listen_lock = threading.Lock()
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more SQL statements than its budget allows"""
+
+class QueryTracker:
+    """Counts the statements executed while it is active
+
+    A statement that runs several times with different parameters is the
+    signature of an N+1 pattern: one query per row of an earlier result.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = Counter()
+        self._parameters = defaultdict(set)
+
+    def record(self, statement: str, parameters):
+        self.count += 1
+        self.statements[statement] += 1
+        self._parameters[statement].add(repr(parameters))
+
+    def repeated(self, threshold: int) -> List[Dict]:
+        """Statements run at least ``threshold`` times with varying parameters"""
+        return [
+            {'statement': statement, 'count': count, 'distinct_parameters': len(self._parameters[statement])}
+            for statement, count in self.statements.most_common()
+            if count >= threshold and len(self._parameters[statement]) > 1
+        ]
+
+    def summary(self, threshold: int = 3) -> str:
+        lines = [f'{self.count} statements']
+        for repeat in self.repeated(threshold):
+            statement = ' '.join(repeat['statement'].split())
+            lines.append(f"  {repeat['count']}x {statement[:200]}")
+        return '\n'.join(lines)
+
+def _active_trackers() -> List[QueryTracker]:
+    trackers = getattr(_local, 'trackers', None)
+    if trackers is None:
+        trackers = _local.trackers = []
+    return trackers
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for tracker in getattr(_local, 'trackers', ()):
+        tracker.record(statement, parameters)
+
+def _ensure_listening():
+    global _listening
+    with _listen_lock:
+        if not _listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            _listening = True
+
+@contextmanager
+def track_queries():
+    """Count the statements executed by the current thread inside the block"""
+    _ensure_listening()
+    tracker = QueryTracker()
+    trackers = _active_trackers()
+    trackers.append(tracker)
+    try:
+        yield tracker
+    finally:
+        trackers.remove(tracker)
+
+@contextmanager
+def query_budget(max_queries: int, n_plus_one_threshold: Optional[int] = None):
+    """Fail if the block runs more than ``max_queries`` statements
+
+    With ``n_plus_one_threshold`` it also fails when any statement repeats
+    that many times with different parameters. Meant for tests, e.g.
+
+        with query_budget(5):
+            client.get('/api/tasks')
+    """
+    with track_queries() as tracker:
+        yield tracker
+
+    if tracker.count > max_queries:
+        raise QueryBudgetExceeded(f'Query budget of {max_queries} exceeded: {tracker.summary()}')
+    if n_plus_one_threshold and tracker.repeated(n_plus_one_threshold):
+        raise QueryBudgetExceeded(f'Repeated statements detected: {tracker.summary(n_plus_one_threshold)}')
+
+class QueryCounter:
+    """Per-request statement counts and N+1 warnings for debug and CI runs
+
+    With SQL_QUERY_DEBUG on, every response carries X-Query-Count, and
+    requests that repeat a statement SQL_N_PLUS_ONE_THRESHOLD times or exceed
+    SQL_QUERY_BUDGET are logged with the offending statements.
+    """
+
+    def init_app(self, app):
+        if not app.config.get('SQL_QUERY_DEBUG'):
+            return
+
+        _ensure_listening()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def _start_request():
+        tracker = QueryTracker()
+        _active_trackers().append(tracker)
+        g.query_tracker = tracker
+
+    @staticmethod
+    def _finish_request(response):
+        tracker = g.get('query_tracker')
+        if tracker is None:
+            return response
+
+        response.headers['X-Query-Count'] = str(tracker.count)
+
+        threshold = current_app.config['SQL_N_PLUS_ONE_THRESHOLD']
+        repeated = tracker.repeated(threshold)
+        if repeated:
+            response.headers['X-Query-Repeated'] = str(len(repeated))
+            logger.warning('Possible N+1 queries in %s %s: %s', request.method, request.path,
+                           tracker.summary(threshold))
+
+        budget = current_app.config.get('SQL_QUERY_BUDGET')
+        if budget and tracker.count > budget:
+            logger.warning('%s %s ran %s statements, over the budget of %s', request.method,
+                           request.path, tracker.count, budget)
+        return response
+
+    @staticmethod
+    def _teardown_request(error=None):
+        tracker = g.pop('query_tracker', None)
+        trackers = _active_trackers()
+        if tracker in trackers:
+            trackers.remove(tracker)
@@ -0,0 +1,106 @@
+from app import db
+from models.task import Task, TaskDependency
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+import json
+
+def hot_queries(user_id: int = 1) -> Dict:
+    """Build the queries that dominate request time, keyed by name"""
+    since = datetime.utcnow() - timedelta(days=30)
+    
+    return {
+        'task_list': Task.query.filter_by(user_id=user_id).order_by(
+            Task.due_date.asc().nulls_last(), Task.id.asc()
+        ).limit(51),
+        'tasks_by_status': Task.query.filter_by(user_id=user_id, status='pending').order_by(
+            Task.due_date.asc()
+        ),
+        'tasks_by_category': Task.query.filter_by(user_id=user_id, category='work'),
+        'tasks_by_priority': Task.query.filter_by(user_id=user_id, priority=3),
+        'completion_trends': Task.query.filter(
+            Task.user_id == user_id,
+            Task.status == 'completed',
+            Task.completed_at >= since
+        ).order_by(Task.completed_at.asc()),
+        'dependent_tasks': Task.query.join(
+            TaskDependency, TaskDependency.task_id == Task.id
+        ).filter(TaskDependency.dependent_task_id == 1),
+    }
+
+# Suffix marking PostgreSQL index scans that have no index condition
+FULL_INDEX_SCAN = ' (full index)'
+
+def explain(query) -> List[str]:
+    """Return the plan lines the database chooses for a query"""
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = query.statement.compile(dialect=dialect)
+    
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    
+    if dialect.name == 'postgresql':
+        # Tiny tables always favour a sequential scan, so ask whether an index
+        # path exists at all rather than whether it wins on this data
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        result = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + str(compiled), params)
+        plan = result.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return list(_walk_postgres_plan(plan[0]['Plan']))
+    
+    if dialect.name == 'sqlite':
+        result = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params)
+        return [row[-1] for row in result]
+    
+    raise NotImplementedError(f'EXPLAIN is not supported for {dialect.name}')
+
+def _walk_postgres_plan(node):
+    """Yield one line per plan node, depth first"""
+    line = node['Node Type']
+    if 'Relation Name' in node:
+        line += f" on {node['Relation Name']}"
+    if 'Index Name' in node:
+        line += f" using {node['Index Name']}"
+        # An index scan without a condition reads the whole index
+        if 'Index Cond' not in node:
+            line += FULL_INDEX_SCAN
+    yield line
+    
+    for child in node.get('Plans', []):
+        yield from _walk_postgres_plan(child)
+
+def full_scans(plan: List[str], covering: Iterable[str] = ()) -> List[str]:
+    """Return the plan lines that read a whole table or a whole index
+
+    A full scan of one of the ``covering`` indexes is accepted, for queries
+    meant to read every entry of an index that holds all their columns.
+    """
+    covering = tuple(covering)
+    scans = []
+    for line in plan:
+        # SQLite reports "SEARCH tasks USING INDEX ..." for an index lookup,
+        # "SCAN tasks" for a table scan and "SCAN tasks USING [COVERING] INDEX
+        # ..." for a full index scan
+        if line.startswith('SCAN '):
+            if not any(f'USING COVERING INDEX {index}' in line for index in covering):
+                scans.append(line)
+        elif line.startswith('Seq Scan'):
+            scans.append(line)
+        elif line.endswith(FULL_INDEX_SCAN):
+            if not (line.startswith('Index Only Scan') and any(f'using {index} ' in line for index in covering)):
+                scans.append(line)
+    return scans
+
+def check_hot_queries(user_id: int = 1) -> Dict[str, Dict]:
+    """Explain every hot query and report whether it avoids full table and index scans"""
+    report = {}
+    for name, query in hot_queries(user_id).items():
+        plan = explain(query)
+        report[name] = {
+            'plan': plan,
+            'full_scans': full_scans(plan)
+        }
+    db.session.rollback()
+    return report
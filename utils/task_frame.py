@@ -0,0 +1,144 @@
+from datetime import datetime
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+# Columns held for every task, in frame order
+FRAME_FIELDS = (
+    'id', 'title', 'status', 'priority', 'category', 'due_date', 'created_at', 'updated_at',
+    'completed_at', 'estimated_duration', 'actual_duration', 'complexity_score',
+    'completed_local_hour', 'completed_local_weekday'
+)
+CATEGORICAL_FIELDS = ('status', 'category')
+DATETIME_FIELDS = ('due_date', 'created_at', 'updated_at', 'completed_at')
+FLOAT_FIELDS = ('estimated_duration', 'actual_duration', 'complexity_score')
+SLOT_FIELDS = ('completed_local_hour', 'completed_local_weekday')
+
+def _encode(values: Sequence, categories: List) -> np.ndarray:
+    """Map values to int16 codes, appending unseen values to ``categories``; None is -1"""
+    lookup = {category: code for code, category in enumerate(categories)}
+    codes = np.empty(len(values), dtype=np.int16)
+    for index, value in enumerate(values):
+        if value is None:
+            codes[index] = -1
+            continue
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(categories)
+            categories.append(value)
+        codes[index] = code
+    return codes
+
+class TaskFrame:
+    """One user's tasks as typed column arrays
+
+    Status and category are int16 codes into per-frame category lists (-1
+    for NULL), dates are datetime64[us] with NaT for NULL, priority is int16
+    with NULL read as the column default 0, the local completion hour and
+    weekday are int8 with -1 for NULL, and the other numeric columns are
+    float64 with NaN for NULL. Rows are ordered by id.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, List],
+                 max_updated_at: Optional[datetime] = None):
+        self.columns = columns
+        self.categories = categories
+        self.max_updated_at = max_updated_at
+
+    @classmethod
+    def from_rows(cls, rows: Sequence, fields: Sequence[str] = FRAME_FIELDS) -> 'TaskFrame':
+        data = dict(zip(fields, zip(*rows))) if rows else {field: () for field in fields}
+        columns = {}
+        categories = {field: [] for field in CATEGORICAL_FIELDS}
+
+        for field, values in data.items():
+            if field in CATEGORICAL_FIELDS:
+                columns[field] = _encode(values, categories[field])
+            elif field in DATETIME_FIELDS:
+                columns[field] = np.array(values, dtype='datetime64[us]')
+            elif field in FLOAT_FIELDS:
+                columns[field] = np.array(values, dtype=np.float64)
+            elif field in SLOT_FIELDS:
+                columns[field] = np.array([-1 if value is None else value for value in values], dtype=np.int8)
+            elif field == 'priority':
+                columns[field] = np.array([value or 0 for value in values], dtype=np.int16)
+            elif field == 'id':
+                columns[field] = np.array(values, dtype=np.int64)
+            else:
+                columns[field] = np.array(values, dtype=object)
+
+        updated = [value for value in data.get('updated_at', ()) if value is not None]
+        return cls(columns, categories, max(updated) if updated else None)
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    @cached_property
+    def nbytes(self) -> int:
+        """Approximate memory held, counting object columns' string contents"""
+        total = 0
+        for column in self.columns.values():
+            total += column.nbytes
+            if column.dtype == object:
+                total += sum(len(value) for value in column if isinstance(value, str))
+        return total
+
+    @property
+    def fingerprint(self) -> str:
+        """Cheap content key: row count, newest update and id checksum"""
+        return f"{len(self)}:{self.max_updated_at}:{int(self.columns['id'].sum())}"
+
+    def code(self, field: str, value) -> int:
+        """Code of a categorical value, or -2 if the frame has none of it"""
+        categories = self.categories[field]
+        return categories.index(value) if value in categories else -2
+
+    def where(self, field: str, value) -> np.ndarray:
+        """Boolean mask of the rows whose categorical ``field`` equals ``value``"""
+        return self.columns[field] == self.code(field, value)
+
+    def decode(self, field: str, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Categorical codes turned back into an object array of values"""
+        codes = self.columns[field] if mask is None else self.columns[field][mask]
+        lookup = np.array(self.categories[field] + [None], dtype=object)
+        return lookup[codes]
+
+    def take(self, selector) -> 'TaskFrame':
+        """Subset of rows by mask or index array, sharing the category lists"""
+        columns = {field: column[selector] for field, column in self.columns.items()}
+        return TaskFrame(columns, self.categories, self.max_updated_at)
+
+    def merge(self, changed: 'TaskFrame') -> 'TaskFrame':
+        """New frame with ``changed`` rows replacing or adding to these rows"""
+        categories = {field: list(values) for field, values in self.categories.items()}
+        incoming = {}
+        for field, column in changed.columns.items():
+            if field in CATEGORICAL_FIELDS:
+                # Re-code the changed rows against the merged category list
+                incoming[field] = _encode(changed.decode(field).tolist(), categories[field])
+            else:
+                incoming[field] = column
+
+        keep = ~np.isin(self.columns['id'], changed.columns['id'])
+        columns = {
+            field: np.concatenate([column[keep], incoming[field]])
+            for field, column in self.columns.items()
+        }
+        order = np.argsort(columns['id'], kind='stable')
+        columns = {field: column[order] for field, column in columns.items()}
+
+        newest = [value for value in (self.max_updated_at, changed.max_updated_at) if value is not None]
+        return TaskFrame(columns, categories, max(newest) if newest else None)
+
+    def to_pandas(self, fields: Optional[Sequence[str]] = None, mask: Optional[np.ndarray] = None):
+        """DataFrame view for pandas code; categoricals are decoded to strings"""
+        import pandas as pd
+
+        data = {}
+        for field in fields or self.columns:
+            if field in CATEGORICAL_FIELDS:
+                data[field] = self.decode(field, mask)
+            else:
+                column = self.columns[field]
+                data[field] = column if mask is None else column[mask]
+        return pd.DataFrame(data)
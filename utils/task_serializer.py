@@ -0,0 +1,107 @@
+from flask import Response
+from app import db
+from models.task import Task
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import orjson
+
+# Columns behind Task.to_dict(), in the same order
+TASK_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.priority,
+    Task.due_date, Task.created_at, Task.updated_at, Task.completed_at,
+    Task.category, Task.complexity_score, Task.enrichment_state, Task.tags,
+    Task.estimated_duration, Task.actual_duration
+)
+
+# Columns behind Task.to_summary_dict()
+SUMMARY_COLUMNS = (
+    Task.id, Task.title, Task.status, Task.priority, Task.category,
+    Task.due_date, Task.completed_at, Task.estimated_duration
+)
+
+DATETIME_FIELDS = ('due_date', 'created_at', 'updated_at', 'completed_at')
+
+def fetch_rows(user_id: int, columns: Sequence = TASK_COLUMNS, *criteria) -> List:
+    """Select only the given columns of a user's tasks as row tuples"""
+    return db.session.execute(
+        db.select(*columns).where(Task.user_id == user_id, *criteria).order_by(Task.id)
+    ).all()
+
+def _transpose(rows: Sequence, fields: List[str]) -> Dict[str, list]:
+    if not rows:
+        return {field: [] for field in fields}
+    return {field: list(values) for field, values in zip(fields, zip(*rows))}
+
+def to_records(rows: Sequence, columns: Sequence = TASK_COLUMNS, now: Optional[datetime] = None,
+               iso_dates: bool = True) -> List[Dict]:
+    """Build Task.to_dict()-shaped records from row tuples
+
+    Work is done a column at a time: derived flags share one ``now``, tags
+    are decoded in one pass and datetimes are formatted only when
+    ``iso_dates`` is set (orjson writes the same ISO form natively).
+    """
+    now = now or datetime.utcnow()
+    fields = [column.key for column in columns]
+    data = _transpose(rows, fields)
+
+    if 'status' in data:
+        data['is_completed'] = is_completed = [status == 'completed' for status in data['status']]
+        if 'due_date' in data:
+            data['is_overdue'] = [
+                due_date is not None and due_date < now and not completed
+                for due_date, completed in zip(data['due_date'], is_completed)
+            ]
+
+    if 'tags' in data:
+        data['tags'] = [orjson.loads(tags) if isinstance(tags, str) else tags for tags in data['tags']]
+
+    if iso_dates:
+        for field in DATETIME_FIELDS:
+            if field in data:
+                data[field] = [value.isoformat() if value is not None else None for value in data[field]]
+
+    keys = list(data)
+    return [dict(zip(keys, values)) for values in zip(*data.values())]
+
+def _default(value):
+    """Encode the pandas and NumPy scalars found in records built from frames"""
+    if isinstance(value, datetime):
+        # pandas Timestamp and NaT subclass datetime; NaT is not equal to itself
+        return None if value != value else value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f'Type is not JSON serializable: {type(value).__name__}')
+
+def dumps(payload: Any) -> bytes:
+    """Encode records with orjson, which also writes datetimes as ISO strings"""
+    return orjson.dumps(payload, default=_default,
+                        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """jsonify() replacement for large task payloads"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def to_frame(rows: Sequence, columns: Sequence = TASK_COLUMNS, now: Optional[datetime] = None):
+    """Build a pandas DataFrame straight from row tuples
+
+    Datetime columns become datetime64 and the derived flags are computed
+    with vectorized comparisons. Tags stay JSON encoded. Analytics routes
+    read the cached TaskStore frames instead; this is for one-off queries.
+    """
+    import pandas as pd
+
+    now = now or datetime.utcnow()
+    fields = [column.key for column in columns]
+    frame = pd.DataFrame.from_records(rows, columns=fields)
+
+    for field in DATETIME_FIELDS:
+        if field in frame.columns:
+            frame[field] = pd.to_datetime(frame[field])
+
+    if 'status' in frame.columns:
+        frame['is_completed'] = frame['status'].eq('completed').to_numpy()
+        if 'due_date' in frame.columns:
+            frame['is_overdue'] = (frame['due_date'].notna() & (frame['due_date'] < now)
+                                   & ~frame['is_completed']).to_numpy()
+
+    return frame
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Hashable, Optional
+import threading
+import time
+
+if TYPE_CHECKING:
+    from utils.task_frame import TaskFrame
+
+class _Entry:
+    __slots__ = ('frame', 'nbytes', 'checked_at', 'stale')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.nbytes = frame.nbytes
+        self.checked_at = time.monotonic()
+        self.stale = False
+
+class TaskStore:
+    """Per-user TaskFrame cache shared by the analytics and ML code
+
+    A frame is built once from a single column query. After a task write it
+    is refreshed incrementally: rows updated since the newest cached
+    ``updated_at`` are merged in, and a COUNT/MAX(updated_at) check catches
+    deletions and writes from other processes, which fall back to a rebuild.
+    Frames are evicted least recently used once their total size exceeds
+    the memory budget.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_age: float = 5.0):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.refreshes = 0
+        self.rebuilds = 0
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the memory budget and revalidation age from the app config"""
+        self.max_bytes = app.config.get('TASK_STORE_MAX_MB', self.max_bytes // (1024 * 1024)) * 1024 * 1024
+        self.max_age = app.config.get('TASK_STORE_MAX_AGE', self.max_age)
+
+    def get(self, user_id: Hashable) -> 'TaskFrame':
+        """Return the user's current frame, refreshing or building it as needed"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                if not entry.stale and time.monotonic() - entry.checked_at < self.max_age:
+                    self.hits += 1
+                    return entry.frame
+
+        frame = self._refresh(user_id, entry.frame) if entry is not None else None
+        if frame is None:
+            frame = self._build(user_id)
+        self._store(user_id, frame)
+        return frame
+
+    def mark_stale(self, user_id: Hashable):
+        """Flag a user's frame for revalidation after their tasks changed"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.stale = True
+
+    def invalidate(self, user_id: Hashable):
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                self._bytes -= entry.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'refreshes': self.refreshes,
+                'rebuilds': self.rebuilds
+            }
+
+    @staticmethod
+    def _columns():
+        from models.task import Task
+        from utils.task_frame import FRAME_FIELDS
+        return [getattr(Task, field) for field in FRAME_FIELDS]
+
+    def _build(self, user_id: Hashable) -> 'TaskFrame':
+        from app import db
+        from models.task import Task
+        from utils.task_frame import TaskFrame
+
+        rows = db.session.execute(
+            db.select(*self._columns()).where(Task.user_id == user_id).order_by(Task.id)
+        ).all()
+        self.rebuilds += 1
+        return TaskFrame.from_rows(rows)
+
+    def _refresh(self, user_id: Hashable, frame: 'TaskFrame') -> Optional['TaskFrame']:
+        """Bring a cached frame up to date, or return None if it must be rebuilt"""
+        from app import db
+        from models.task import Task
+        from utils.task_frame import TaskFrame
+
+        count, max_updated_at = db.session.execute(
+            db.select(db.func.count(Task.id), db.func.max(Task.updated_at)).where(Task.user_id == user_id)
+        ).one()
+        if count == len(frame) and max_updated_at == frame.max_updated_at:
+            return frame
+        if frame.max_updated_at is None or max_updated_at is None:
+            return None
+
+        # Rows stamped at the newest cached time are re-read in case a write
+        # landed within the same clock tick
+        rows = db.session.execute(
+            db.select(*self._columns()).where(
+                Task.user_id == user_id, Task.updated_at >= frame.max_updated_at
+            ).order_by(Task.id)
+        ).all()
+        merged = frame.merge(TaskFrame.from_rows(rows))
+        if len(merged) != count:
+            # Tasks were deleted; the delta cannot show which
+            return None
+
+        self.refreshes += 1
+        return merged
+
+    def _store(self, user_id: Hashable, frame: 'TaskFrame'):
+        entry = _Entry(frame)
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[user_id] = entry
+            self._bytes += entry.nbytes
+
+            # Keep the newest frame even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
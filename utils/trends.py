@@ -0,0 +1,125 @@
+from app import db, task_store
+from models.task import Task
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, List, Optional, Tuple
+
+BUCKETS = ('hour', 'day', 'week', 'month')
+
+# Label format of each bucket's start, in the user's local time
+LABEL_FORMATS = {
+    'hour': '%Y-%m-%dT%H:00',
+    'day': '%Y-%m-%d',
+    'week': '%Y-%m-%d',
+    'month': '%Y-%m'
+}
+
+# NumPy unit each bucket is floored to; weeks are floored to days, then to Monday
+NUMPY_UNITS = {'hour': 'h', 'day': 'D', 'week': 'D', 'month': 'M'}
+
+UNCATEGORIZED = 'uncategorized'
+
+def bucket_start(value: datetime, bucket: str) -> datetime:
+    """Start of the bucket containing a naive local datetime"""
+    if bucket == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+def _to_utc(value: datetime, zone: tzinfo) -> datetime:
+    """Local time to the naive UTC time tasks are stored in
+
+    Naive values are read in ``zone``; aware values keep their own offset.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=zone)
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _sql_counts(user_id: int, start: datetime, end: datetime, bucket: str, zone: tzinfo,
+                by_category: bool) -> List[Tuple[datetime, Optional[str], int]]:
+    """Bucket counts from one GROUP BY date_trunc query (PostgreSQL)"""
+    local_time = db.func.timezone(str(zone), db.func.timezone('UTC', Task.completed_at))
+    columns = [db.func.date_trunc(bucket, local_time).label('bucket')]
+    # Group by the output name: a repeated expression would get fresh bind
+    # parameters, which PostgreSQL does not treat as the same expression
+    groups = [db.literal_column('bucket')]
+    if by_category:
+        columns.append(Task.category)
+        groups.append(Task.category)
+
+    rows = db.session.execute(
+        db.select(*columns, db.func.count()).where(
+            Task.user_id == user_id,
+            Task.status == 'completed',
+            Task.completed_at >= start,
+            Task.completed_at < end
+        ).group_by(*groups).order_by(groups[0])
+    ).all()
+    if by_category:
+        return [tuple(row) for row in rows]
+    return [(bucket_time, None, count) for bucket_time, count in rows]
+
+def _frame_counts(user_id: int, start: datetime, end: datetime, bucket: str, zone: tzinfo,
+                  by_category: bool) -> List[Tuple[datetime, Optional[str], int]]:
+    """Bucket counts from the user's cached task frame, for other databases"""
+    import numpy as np
+    import pandas as pd
+
+    frame = task_store.get(user_id)
+    completed_at = frame.columns['completed_at']
+    mask = (frame.where('status', 'completed')
+            & (completed_at >= np.datetime64(start)) & (completed_at < np.datetime64(end)))
+    if not mask.any():
+        return []
+
+    # Shift to local time with the zone's own offsets, so DST is honoured
+    local = pd.DatetimeIndex(completed_at[mask]).tz_localize('UTC').tz_convert(zone).tz_localize(None)
+    buckets = local.to_numpy().astype(f'datetime64[{NUMPY_UNITS[bucket]}]')
+    if bucket == 'week':
+        # 1970-01-01 was a Thursday; step back to the Monday of each week
+        days = buckets.astype(np.int64)
+        buckets = (days - (days + 3) % 7).astype('datetime64[D]')
+
+    # Count (bucket, category) pairs in one pass over combined integer keys
+    if by_category:
+        codes = frame.columns['category'][mask].astype(np.int64) + 1
+    else:
+        codes = np.zeros(len(buckets), dtype=np.int64)
+    width = len(frame.categories['category']) + 1
+    keys, counts = np.unique(buckets.astype(np.int64) * width + codes, return_counts=True)
+
+    unit = buckets.dtype
+    names = [None] + list(frame.categories['category'])
+    starts = (keys // width).astype(unit).astype('datetime64[us]').tolist()
+    return [
+        (bucket_time, names[code], int(count))
+        for bucket_time, code, count in zip(starts, (keys % width).tolist(), counts.tolist())
+    ]
+
+def completion_trends(user_id: int, start: datetime, end: datetime, bucket: str = 'day',
+                      zone: tzinfo = timezone.utc, by_category: bool = False) -> Dict:
+    """Completed tasks per bucket between two naive local times
+
+    Returns ``{label: count}`` ordered by bucket, or ``{label: {category:
+    count}}`` when split by category. Empty buckets are left out. PostgreSQL
+    buckets in SQL with date_trunc in the user's zone; other databases bucket
+    the cached task frame with vectorized NumPy.
+    """
+    start_utc, end_utc = _to_utc(start, zone), _to_utc(end, zone)
+    if db.session.connection().dialect.name == 'postgresql':
+        rows = _sql_counts(user_id, start_utc, end_utc, bucket, zone, by_category)
+    else:
+        rows = _frame_counts(user_id, start_utc, end_utc, bucket, zone, by_category)
+
+    label_format = LABEL_FORMATS[bucket]
+    trends = {}
+    for bucket_time, category, count in rows:
+        label = bucket_time.strftime(label_format)
+        if by_category:
+            trends.setdefault(label, {})[category or UNCATEGORIZED] = count
+        else:
+            trends[label] = trends.get(label, 0) + count
+    return trends
@@ -0,0 +1,100 @@
+from app import db
+from models.analytics import UserAnalytics
+from models.workspace import WorkspaceMember
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import orjson
+
+def _histogram(stored) -> Dict:
+    """A stored JSON histogram as a dict"""
+    if not stored:
+        return {}
+    return orjson.loads(stored) if isinstance(stored, (str, bytes)) else stored
+
+def merge_member_analytics(members: Iterable[UserAnalytics], now: Optional[datetime] = None) -> Dict:
+    """Merge members' analytics rows into one workspace rollup in a single pass
+
+    Counters and histograms are summed, and the completion matrices are
+    added in one NumPy reduction with the hourly totals derived from the
+    sum. The result has the keys of UserAnalytics.to_dict(), so the team
+    dashboard reuses the individual charts, plus ``member_count`` and
+    ``active_members``. The completion time is weighted by completions;
+    streaks are the members' best and the productivity score their mean.
+    """
+    import numpy as np
+
+    active_since = (now or datetime.utcnow()) - timedelta(days=1)
+    member_count = active_members = 0
+    created = completed = productive_time = 0
+    timed_completions = 0
+    completion_minutes = 0.0
+    daily_times = []
+    scores = []
+    current_streak = longest_streak = 0
+    matrices = []
+    categories, tags, complexity = Counter(), Counter(), Counter()
+
+    for analytics in members:
+        member_count += 1
+        member_completed = analytics.total_tasks_completed or 0
+        created += analytics.total_tasks_created or 0
+        completed += member_completed
+        productive_time += analytics.total_productive_time or 0
+        if analytics.average_completion_time is not None and member_completed:
+            completion_minutes += analytics.average_completion_time * member_completed
+            timed_completions += member_completed
+        if analytics.average_daily_productive_time is not None:
+            daily_times.append(analytics.average_daily_productive_time)
+
+        current_streak = max(current_streak, analytics.current_streak or 0)
+        longest_streak = max(longest_streak, analytics.longest_streak or 0)
+        if analytics.last_activity_date and analytics.last_activity_date >= active_since:
+            active_members += 1
+        # The completion rate is only set once a member completes a task
+        scores.append(analytics.calculate_productivity_score() if analytics.completion_rate is not None else 0)
+
+        if analytics.productivity_matrix:
+            matrices.append(analytics.productivity_matrix)
+        categories.update(_histogram(analytics.common_categories))
+        tags.update(_histogram(analytics.common_tags))
+        complexity.update(_histogram(analytics.task_complexity_distribution))
+
+    # Stored matrices are little-endian, whatever the host byte order
+    if matrices:
+        matrix = np.frombuffer(b''.join(matrices), dtype='<u4').reshape(-1, 168).sum(axis=0, dtype=np.int64)
+    else:
+        matrix = np.zeros(168, dtype=np.int64)
+    hours = matrix.reshape(7, 24).sum(axis=0).tolist()
+
+    return {
+        'member_count': member_count,
+        'active_members': active_members,
+        'total_tasks_completed': completed,
+        'total_tasks_created': created,
+        'completion_rate': completed / created * 100 if created else 0,
+        'average_completion_time': completion_minutes / timed_completions if timed_completions else None,
+        'total_productive_time': productive_time,
+        'average_daily_productive_time': sum(daily_times) / len(daily_times) if daily_times else None,
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'productivity_score': round(sum(scores) / len(scores), 2) if scores else 0,
+        'most_productive_hours': {str(hour): count for hour, count in enumerate(hours) if count},
+        'productivity_matrix': matrix.tolist(),
+        'common_categories': dict(categories),
+        'common_tags': dict(tags),
+        'task_complexity_distribution': dict(complexity)
+    }
+
+def aggregate_workspace(workspace_id: int) -> Tuple[Dict, List[int]]:
+    """Roll up a workspace's member analytics from one joined query
+
+    Only members who accepted their invite are included. Returns the rollup
+    and the member ids it was built from.
+    """
+    members = db.session.execute(
+        db.select(UserAnalytics)
+        .join(WorkspaceMember, WorkspaceMember.user_id == UserAnalytics.user_id)
+        .where(WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.status == 'active')
+    ).scalars().all()
+    return merge_member_analytics(members), [analytics.user_id for analytics in members]
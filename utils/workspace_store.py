@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set
+import threading
+import time
+
+class _Entry:
+    __slots__ = ('rollup', 'member_ids', 'expires_at')
+
+    def __init__(self, rollup: Dict, member_ids: List[Hashable], ttl: float):
+        self.rollup = rollup
+        self.member_ids = member_ids
+        self.expires_at = time.monotonic() + ttl
+
+class WorkspaceStore:
+    """Cache of workspace analytics rollups shared by the team dashboards
+
+    A rollup is merged from every member's analytics row in one joined query
+    and one pass, so a team dashboard costs about as much as an individual
+    one however many members the workspace has. Rollups are dropped as soon
+    as a member's tasks or the membership change, and expire after ``ttl``
+    seconds; the cache is per process, so the TTL bounds how long writes
+    handled by another worker can stay hidden. Cached rollups are shared
+    between requests and must not be modified.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._user_workspaces: Dict[Hashable, Set[Hashable]] = {}
+        # Invalidations are numbered; while rollups are being aggregated the
+        # generation of each invalidated workspace and user is kept, so a
+        # rollup built across an invalidation that concerns it is not stored
+        self._generation = 0
+        self._cleared_at = 0
+        self._building = 0
+        self._invalidated_workspaces: Dict[Hashable, int] = {}
+        self._invalidated_users: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the TTL and size from the app config"""
+        self.ttl = app.config.get('WORKSPACE_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('WORKSPACE_CACHE_SIZE', self.max_entries)
+
+    def get(self, workspace_id: Hashable) -> Dict:
+        """Return the workspace's rollup, aggregating it on a miss"""
+        with self._lock:
+            entry = self._entries.get(workspace_id)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(workspace_id)
+                self.hits += 1
+                return entry.rollup
+            self.misses += 1
+            started = self._generation
+            self._building += 1
+
+        from utils.workspace_analytics import aggregate_workspace
+        entry = None
+        try:
+            rollup, member_ids = aggregate_workspace(workspace_id)
+            if self.ttl > 0:
+                entry = _Entry(rollup, member_ids, self.ttl)
+        finally:
+            self._finish(workspace_id, entry, started)
+        return rollup
+
+    def invalidate(self, workspace_id: Hashable):
+        with self._lock:
+            self._generation += 1
+            if self._building:
+                self._invalidated_workspaces[workspace_id] = self._generation
+            self._drop(workspace_id)
+
+    def invalidate_user(self, user_id: Hashable):
+        """Drop the cached rollup of every workspace the user belongs to"""
+        with self._lock:
+            self._generation += 1
+            if self._building:
+                self._invalidated_users[user_id] = self._generation
+            for workspace_id in list(self._user_workspaces.get(user_id, ())):
+                self._drop(workspace_id)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._entries.clear()
+            self._user_workspaces.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _finish(self, workspace_id: Hashable, entry: Optional[_Entry], started: int):
+        """Store a freshly aggregated rollup unless it was invalidated meanwhile"""
+        with self._lock:
+            self._building -= 1
+            if entry is not None and not self._stale(workspace_id, entry, started):
+                self._drop(workspace_id)
+                self._entries[workspace_id] = entry
+                for user_id in entry.member_ids:
+                    self._user_workspaces.setdefault(user_id, set()).add(workspace_id)
+                while len(self._entries) > self.max_entries:
+                    self._drop(next(iter(self._entries)))
+            if not self._building:
+                self._invalidated_workspaces.clear()
+                self._invalidated_users.clear()
+
+    def _stale(self, workspace_id: Hashable, entry: _Entry, started: int) -> bool:
+        if self._cleared_at > started or self._invalidated_workspaces.get(workspace_id, 0) > started:
+            return True
+        return any(self._invalidated_users.get(user_id, 0) > started for user_id in entry.member_ids)
+
+    def _drop(self, workspace_id: Hashable):
+        entry = self._entries.pop(workspace_id, None)
+        if entry is None:
+            return
+        for user_id in entry.member_ids:
+            workspaces = self._user_workspaces.get(user_id)
+            if workspaces is not None:
+                workspaces.discard(workspace_id)
+                if not workspaces:
+                    del self._user_workspaces[user_id]